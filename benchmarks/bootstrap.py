@@ -0,0 +1,37 @@
+"""Подготовка Django для скриптов измерений.
+
+Импортируйте модуль до моделей проекта: он добавляет blogicum/ в sys.path
+и вызывает django.setup(). База выбирается функцией setup_database().
+"""
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'blogicum'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+
+def setup_database(db_path=None):
+    """Тестовая база в памяти или файл db_path с применёнными миграциями.
+
+    Файл можно переиспользовать между запусками, чтобы не заполнять
+    крупный набор данных заново.
+    """
+    setup_test_environment(debug=False)
+    settings.ALLOWED_HOSTS = ['testserver']
+    if db_path is None:
+        connection.creation.create_test_db(verbosity=0)
+        return
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    connection.settings_dict['NAME'] = str(db_path)
+    call_command('migrate', verbosity=0)
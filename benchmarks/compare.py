@@ -0,0 +1,53 @@
+"""Сравнение двух отчётов latency.py.
+
+    python benchmarks/compare.py base.json head.json --fail-over 20
+
+Печатает изменение p50/p95 и числа запросов по каждому случаю; с
+--fail-over завершается с кодом 1, если p95 какого-либо случая вырос
+больше чем на указанный процент или выросло число запросов.
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as fh:
+        report = json.load(fh)
+    return report, {(r['case'], r['client'], r['url']): r
+                    for r in report['results']}
+
+
+def change(before, after):
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base')
+    parser.add_argument('head')
+    parser.add_argument('--fail-over', type=float,
+                        help='Допустимый рост p95, %%.')
+    args = parser.parse_args()
+
+    base_report, base = load(args.base)
+    head_report, head = load(args.head)
+    print(f'{base_report["commit"]} -> {head_report["commit"]}')
+    regressions = []
+    for key in sorted(base.keys() & head.keys()):
+        old, new = base[key], head[key]
+        p95 = change(old['p95_ms'], new['p95_ms'])
+        print(f'{key[0]:<22}{key[1]:<6}'
+              f'{old["p50_ms"]:>9.2f}{new["p50_ms"]:>9.2f}'
+              f'{old["p95_ms"]:>9.2f}{new["p95_ms"]:>9.2f}{p95:>+8.1f}%'
+              f'{old["queries"]:>5}{new["queries"]:>5}  {key[2]}')
+        if args.fail_over is not None and (
+                p95 > args.fail_over or new['queries'] > old['queries']):
+            regressions.append(key)
+    if regressions:
+        print(f'Регрессии: {len(regressions)}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
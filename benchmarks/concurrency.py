@@ -0,0 +1,165 @@
+"""Пропускная способность SQLite при одновременном чтении и записи.
+
+    python benchmarks/concurrency.py --readers 8 --writers 2 --duration 10
+    python benchmarks/concurrency.py --db /tmp/bench.sqlite3 --no-seed
+
+Скрипт работает с файлом SQLite (по умолчанию во временном каталоге) и
+для каждого профиля PRAGMA нагружает сайт из потоков тестовым клиентом:
+читатели открывают ленту, страницы публикаций, категорию и профиль
+автора, писатели добавляют комментарии. Профиль default — журнал отката
+и настройки SQLite по умолчанию, tuned — BLOG_SQLITE_PRAGMAS из
+settings.py. Для каждого профиля выводятся запросы в секунду, p95
+задержки и число ошибок «database is locked».
+"""
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import bootstrap
+import seed as dataset
+
+from django.conf import settings  # noqa: E402
+from django.db import OperationalError, connection, connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from blog.models import Post  # noqa: E402
+
+PROFILES = {
+    'default': {
+        'journal_mode': 'delete',
+        'synchronous': 'full',
+        'mmap_size': 0,
+        'cache_size': -2000,
+    },
+    'tuned': settings.BLOG_SQLITE_PRAGMAS,
+}
+
+
+class Stats:
+    """Результаты потоков одного вида нагрузки"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = []
+        self.locked = 0
+
+    def add(self, timings, locked):
+        with self.lock:
+            self.timings.extend(timings)
+            self.locked += locked
+
+    def p95_ms(self):
+        if not self.timings:
+            return 0.0
+        ordered = sorted(self.timings)
+        return ordered[int((len(ordered) - 1) * 0.95)] * 1000
+
+
+def worker(request, client, deadline, stats, seed):
+    rng = random.Random(seed)
+    timings = []
+    locked = 0
+    try:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                request(client, rng)
+            except OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+                locked += 1
+                continue
+            timings.append(time.perf_counter() - started)
+    finally:
+        connections.close_all()
+        stats.add(timings, locked)
+
+
+def run(profile, author, read_urls, post_ids, args):
+    settings.BLOG_SQLITE_PRAGMAS = PROFILES[profile]
+    connections.close_all()
+    connection.ensure_connection()
+
+    def read(client, rng):
+        client.get(rng.choice(read_urls))
+
+    def write(client, rng):
+        client.post(
+            reverse('blog:add_comment',
+                    kwargs={'post_id': rng.choice(post_ids)}),
+            {'text': 'Комментарий под нагрузкой'})
+
+    reads, writes = Stats(), Stats()
+    jobs = ([(read, reads)] * args.readers
+            + [(write, writes)] * args.writers)
+    clients = []
+    for _ in jobs:
+        client = Client()
+        client.force_login(author)
+        clients.append(client)
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=worker,
+                         args=(request, client, deadline, stats, n))
+        for n, ((request, stats), client) in enumerate(zip(jobs, clients))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return reads, writes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--db', type=Path,
+                        help='Файл SQLite; по умолчанию временный.')
+    parser.add_argument('--no-seed', action='store_true',
+                        help='Не заполнять базу: данные уже есть в --db.')
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10.0,
+                        help='Длительность прогона каждого профиля, с.')
+    args = parser.parse_args()
+
+    db_path = args.db or Path(tempfile.mkdtemp()) / 'concurrency.sqlite3'
+    bootstrap.setup_database(db_path)
+    if args.no_seed:
+        author = dataset.User.objects.get(username=dataset.BENCH_USERNAME)
+    else:
+        author, _ = dataset.seed(args.posts, verbose=False)
+    posts = list(Post.objects.feed_entries()
+                 .filter(author=author)[:20])
+    post_ids = [post.id for post in posts]
+    read_urls = [reverse('blog:index'),
+                 f'{reverse("blog:index")}?page=2',
+                 reverse('blog:profile', args=[author.username]),
+                 reverse('blog:category_posts',
+                         args=[posts[0].category.slug])]
+    read_urls += [reverse('blog:post_detail', args=[pk]) for pk in post_ids]
+
+    print(f'{db_path}: читателей {args.readers}, писателей {args.writers}, '
+          f'{args.duration:.0f} с на профиль')
+    print(f'{"profile":<10}{"reads/s":>10}{"writes/s":>10}'
+          f'{"read p95":>10}{"write p95":>10}{"locked":>8}')
+    throughput = {}
+    for profile in PROFILES:
+        reads, writes = run(profile, author, read_urls, post_ids, args)
+        throughput[profile] = (
+            (len(reads.timings) + len(writes.timings)) / args.duration)
+        print(f'{profile:<10}'
+              f'{len(reads.timings) / args.duration:>10.1f}'
+              f'{len(writes.timings) / args.duration:>10.1f}'
+              f'{reads.p95_ms():>10.1f}{writes.p95_ms():>10.1f}'
+              f'{reads.locked + writes.locked:>8}')
+    if throughput['default']:
+        print(f'Прирост пропускной способности: '
+              f'{throughput["tuned"] / throughput["default"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
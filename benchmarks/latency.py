@@ -0,0 +1,155 @@
+"""Задержка и число SQL-запросов для каждого адреса blog/ и pages/.
+
+    python benchmarks/latency.py --posts 10000 --repeat 50
+    python benchmarks/latency.py --db /tmp/bench.sqlite3 --no-seed
+
+Для каждого именованного адреса из blog/urls.py и pages/urls.py делается
+--warmup запросов на прогрев и --repeat измеряемых GET-запросов тестовым
+клиентом: от имени автора публикаций и, для общедоступных страниц,
+анонимно. Результат (p50/p95/среднее в мс, число запросов к базе из
+заголовка X-SQL-Queries) пишется в JSON; сравнить два запуска можно
+скриптом compare.py.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import bootstrap
+import seed as dataset
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from blog import urls as blog_urls  # noqa: E402
+from blog.models import Comment, Post  # noqa: E402
+from pages import urls as pages_urls  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+PUBLIC_URLS = {'blog:index', 'blog:category_posts', 'blog:profile',
+               'pages:about', 'pages:rules'}
+
+
+def url_kwargs(author, category):
+    post = (Post.objects.published_filter().filter(author=author)
+            .order_by('-comment_count').first())
+    comment = Comment.objects.filter(post=post).first()
+    if comment is not None and comment.author_id != author.id:
+        Comment.objects.filter(pk=comment.pk).update(author=author)
+    return {
+        'id': post.id,
+        'post_id': post.id,
+        'comment_id': comment.id if comment else None,
+        'category_slug': category.slug,
+        'username': author.username,
+    }
+
+
+def cases(author, category):
+    values = url_kwargs(author, category)
+    for module in (blog_urls, pages_urls):
+        for pattern in module.urlpatterns:
+            name = f'{module.app_name}:{pattern.name}'
+            params = pattern.pattern.converters.keys()
+            if any(values.get(param) is None for param in params):
+                continue
+            url = reverse(name, kwargs={p: values[p] for p in params})
+            yield name, 'auth', url
+            if name in PUBLIC_URLS:
+                yield name, 'anon', url
+    feed_pages = max(1, Post.objects.published_filter().count() // 10)
+    yield 'blog:index', 'auth', f'{reverse("blog:index")}?page={feed_pages}'
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def measure(client, url, warmup, repeat):
+    for _ in range(warmup):
+        client.get(url)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'status': response.status_code,
+        'queries': int(response.get('X-SQL-Queries', -1)),
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=bootstrap.ROOT,
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--comments-per-post', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', help='Файл SQLite вместо базы в памяти.')
+    parser.add_argument('--no-seed', action='store_true',
+                        help='Не заполнять базу: данные уже есть в --db.')
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=30)
+    parser.add_argument('--output', type=Path)
+    args = parser.parse_args()
+
+    bootstrap.setup_database(args.db)
+    # Число запросов берётся из заголовка X-SQL-Queries, вне DEBUG он
+    # по умолчанию выключен
+    settings.BLOG_QUERY_STATS_HEADERS = True
+    if args.no_seed:
+        author = dataset.User.objects.get(username=dataset.BENCH_USERNAME)
+        category = (dataset.Category.objects.filter(is_published=True)
+                    .order_by('id').first())
+    else:
+        author, category = dataset.seed(
+            args.posts, args.comments_per_post, args.seed)
+
+    clients = {'anon': Client(), 'auth': Client()}
+    clients['auth'].force_login(author)
+    results = []
+    for name, client_name, url in cases(author, category):
+        result = measure(clients[client_name], url, args.warmup, args.repeat)
+        results.append({'case': name, 'client': client_name, 'url': url,
+                        **result})
+        print(f'{name:<22}{client_name:<6}{result["p50_ms"]:>9.2f}'
+              f'{result["p95_ms"]:>9.2f}{result["queries"]:>5}  {url}')
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'dataset': {'posts': Post.objects.count(),
+                    'comments': Comment.objects.count(),
+                    'seed': args.seed},
+        'repeat': args.repeat,
+        'results': results,
+    }
+    output = args.output or RESULTS_DIR / f'{commit or "latest"}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f'Результаты: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Загрузка дампа командами loaddata и load_dump.
+
+    python benchmarks/load_dump.py --posts 20000
+
+Скрипт пишет во временный файл дамп в формате dumpdata: пользователи,
+категории, местоположения и --posts публикаций. Затем дамп загружается
+в пустую тестовую базу стандартной командой loaddata и потоковой
+командой load_dump (без пересборки производных данных). Для каждой
+выводятся время, объекты в секунду и пик памяти Python (tracemalloc).
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import bootstrap
+
+from django.core.management import call_command  # noqa: E402
+
+WORDS = ('блог', 'путешествие', 'город', 'утро', 'море', 'горы', 'книга')
+
+
+def write_dump(path, posts):
+    users = max(10, posts // 20)
+    categories = max(5, posts // 1000)
+    objects = [
+        {'model': 'auth.user', 'pk': n,
+         'fields': {'username': f'user{n}', 'password': '!',
+                    'date_joined': '2023-01-01T00:00:00Z'}}
+        for n in range(1, users + 1)]
+    objects += [
+        {'model': 'blog.category', 'pk': n,
+         'fields': {'title': f'Категория {n}', 'description': 'Описание',
+                    'slug': f'category-{n}', 'is_published': True,
+                    'created_at': '2023-01-01T00:00:00Z'}}
+        for n in range(1, categories + 1)]
+    objects += [
+        {'model': 'blog.location', 'pk': n,
+         'fields': {'name': f'Место {n}', 'is_published': True,
+                    'created_at': '2023-01-01T00:00:00Z'}}
+        for n in range(1, 51)]
+    objects += [
+        {'model': 'blog.post', 'pk': n,
+         'fields': {'title': f'Публикация {n}',
+                    'text': ' '.join(WORDS[(n + i) % len(WORDS)]
+                                     for i in range(60)),
+                    'pub_date': '2023-01-01T00:00:00Z',
+                    'author': n % users + 1, 'category': n % categories + 1,
+                    'location': n % 50 + 1, 'is_published': True,
+                    'created_at': '2023-01-01T00:00:00Z'}}
+        for n in range(1, posts + 1)]
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(objects, file, ensure_ascii=False, indent=2)
+    return len(objects)
+
+
+def measure(label, command, *args, **options):
+    call_command('flush', interactive=False, verbosity=0)
+    tracemalloc.start()
+    started = time.perf_counter()
+    call_command(command, *args, verbosity=0, **options)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return label, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    bootstrap.setup_database()
+    path = os.path.join(tempfile.mkdtemp(), 'dump.json')
+    total = write_dump(path, args.posts)
+    size = os.path.getsize(path) / 2 ** 20
+    print(f'Дамп: {total} объектов, {size:.1f} МиБ')
+    results = [
+        measure('loaddata', 'loaddata', path),
+        measure('load_dump', 'load_dump', path, rebuild=False,
+                batch_size=args.batch_size,
+                stdout=open(os.devnull, 'w')),
+    ]
+    for label, elapsed, peak in results:
+        print(f'{label:10} {elapsed:7.2f} с  {total / elapsed:8.0f} '
+              f'объектов/с  пик памяти {peak / 2 ** 20:6.1f} МиБ')
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Пропускная способность раздачи файлов из MEDIA_ROOT.
+
+    python benchmarks/media.py --size 1024 --duration 3
+
+Скрипт сравнивает django.views.static.serve, которой раньше отдавались
+файлы, с blog.media.serve_media на файле --size КиБ во временном
+MEDIA_ROOT. Сценарии: первый запрос (файл целиком), повторный запрос
+браузера с If-None-Match и If-Modified-Since, докачка последних 64 КиБ
+(Range) и передача файла веб-серверу через X-Accel-Redirect. Для
+каждого сценария выводятся запросы в секунду и байты тела на запрос.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import bootstrap  # noqa: F401
+
+from django.conf import settings  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.views.static import serve  # noqa: E402
+
+from blog.media import serve_media  # noqa: E402
+
+NAME = 'post_images/bench.jpg'
+
+
+def body_size(response):
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    response.close()
+    return size
+
+
+def measure(view, headers, duration):
+    factory = RequestFactory()
+    requests = 0
+    transferred = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        request = factory.get(f'/media/{NAME}', **headers)
+        transferred += body_size(view(request, NAME))
+        requests += 1
+    return requests / duration, transferred / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=1024,
+                        help='Размер файла, КиБ.')
+    parser.add_argument('--duration', type=float, default=3.0,
+                        help='Длительность каждого сценария, с.')
+    args = parser.parse_args()
+
+    settings.MEDIA_ROOT = tempfile.mkdtemp()
+    path = os.path.join(settings.MEDIA_ROOT, NAME)
+    os.makedirs(os.path.dirname(path))
+    with open(path, 'wb') as file:
+        file.write(os.urandom(args.size * 1024))
+
+    def static_serve(request, name):
+        return serve(request, name, document_root=settings.MEDIA_ROOT)
+
+    def accel_serve(request, name):
+        settings.BLOG_MEDIA_SENDFILE = 'x-accel-redirect'
+        try:
+            return serve_media(request, name)
+        finally:
+            settings.BLOG_MEDIA_SENDFILE = None
+
+    first = serve_media(RequestFactory().get('/'), NAME)
+    revalidate = {'HTTP_IF_NONE_MATCH': first['ETag'],
+                  'HTTP_IF_MODIFIED_SINCE': first['Last-Modified']}
+    first.close()
+    scenarios = (
+        ('full', {}),
+        ('revalidate', revalidate),
+        ('range 64K', {'HTTP_RANGE': 'bytes=-65536'}),
+    )
+    print(f'Файл {args.size} КиБ, {args.duration:.0f} с на сценарий')
+    print(f'{"scenario":<14}{"view":<14}{"req/s":>10}{"bytes/req":>12}')
+    for label, headers in scenarios:
+        for view_name, view in (('static.serve', static_serve),
+                                ('serve_media', serve_media)):
+            rate, size = measure(view, headers, args.duration)
+            print(f'{label:<14}{view_name:<14}{rate:>10.0f}{size:>12.0f}')
+    rate, size = measure(accel_serve, {}, args.duration)
+    print(f'{"full":<14}{"x-accel":<14}{rate:>10.0f}{size:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
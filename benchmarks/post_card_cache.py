@@ -0,0 +1,67 @@
+"""Время отрисовки страницы ленты с холодным и тёплым кэшем карточек.
+
+Запуск из корня репозитория:
+
+    python benchmarks/post_card_cache.py --posts 500 --repeat 30
+
+Скрипт создаёт тестовую базу в памяти, заполняет её набором seed.py и
+отрисовывает главную страницу, категорию и профиль от имени
+авторизованного пользователя (кэш страниц для него не используется).
+«Холодный» проход очищает кэш карточек перед каждой отрисовкой.
+"""
+import argparse
+import statistics
+import time
+
+import bootstrap
+import seed as dataset
+
+from django.test import RequestFactory  # noqa: E402
+
+from blog.cache import post_card_cache  # noqa: E402
+from blog.views import (  # noqa: E402
+    CategoryPostsListView, PostListView, ProfileListView
+)
+
+
+def render_ms(view_class, user, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    started = time.perf_counter()
+    view_class.as_view()(request, **kwargs).render()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(view_class, user, repeat, cold, **kwargs):
+    timings = []
+    for _ in range(repeat):
+        if cold:
+            post_card_cache().clear()
+        timings.append(render_ms(view_class, user, **kwargs))
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    bootstrap.setup_database()
+    author, category = dataset.seed(args.posts, verbose=False)
+    pages = (
+        ('blog:index', PostListView, {}),
+        ('blog:category_posts', CategoryPostsListView,
+         {'category_slug': category.slug}),
+        ('blog:profile', ProfileListView, {'username': author.username}),
+    )
+    print(f'{"page":<22}{"cold, ms":>10}{"warm, ms":>10}')
+    for name, view_class, kwargs in pages:
+        cold = measure(view_class, author, args.repeat, True, **kwargs)
+        measure(view_class, author, 1, False, **kwargs)
+        warm = measure(view_class, author, args.repeat, False, **kwargs)
+        print(f'{name:<22}{cold:>10.2f}{warm:>10.2f}')
+
+
+if __name__ == '__main__':
+    main()
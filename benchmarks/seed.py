@@ -0,0 +1,134 @@
+"""Масштабируемый набор данных для измерений.
+
+    python benchmarks/seed.py --posts 100000 --db /tmp/blogicum-bench.sqlite3
+
+Создаёт пользователей, категории (часть скрыта), местоположения и
+публикации: большинство опубликовано, часть снята с публикации, часть
+отложена на будущее. Комментарии распределяются неравномерно, счётчик
+Post.comment_count заполняется сразу, лента FeedEntry пересобирается
+после вставки. Данные детерминированы --seed.
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+import bootstrap
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from blog.feed import rebuild_feed  # noqa: E402
+from blog.models import Category, Comment, Location, Post  # noqa: E402
+from blog.rendering import render_post  # noqa: E402
+from blog.search import rebuild_search_index  # noqa: E402
+
+User = get_user_model()
+
+BATCH_SIZE = 5000
+BENCH_USERNAME = 'bench_author'
+WORDS = ('блог', 'путешествие', 'город', 'утро', 'море', 'горы', 'книга',
+         'кофе', 'дорога', 'вечер', 'друзья', 'музыка', 'дождь', 'лето')
+
+
+def text(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def batched(objects, model):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def seed(posts=1000, comments_per_post=3, seed=0, verbose=True):
+    """Заполняет базу; возвращает автора и категорию для измерений"""
+    rng = random.Random(seed)
+    now = timezone.now()
+    started = time.perf_counter()
+
+    password = make_password(None)
+    users = max(10, posts // 20)
+    batched((User(username=f'user{n}', password=password)
+             for n in range(1, users)), User)
+    author = User.objects.create(username=BENCH_USERNAME, password=password)
+    user_ids = list(User.objects.values_list('id', flat=True))
+
+    categories = [
+        Category(title=f'Категория {n}', description=text(rng, 20),
+                 slug=f'category-{n}', is_published=rng.random() > 0.1)
+        for n in range(max(5, posts // 1000))]
+    categories[0].is_published = True
+    Category.objects.bulk_create(categories)
+    category_ids = list(Category.objects.order_by('id')
+                        .values_list('id', flat=True))
+    Location.objects.bulk_create(
+        Location(name=f'Место {n}', is_published=rng.random() > 0.1)
+        for n in range(50))
+    location_ids = list(Location.objects.values_list('id', flat=True))
+
+    first_post_id = (Post.objects.order_by('-id')
+                     .values_list('id', flat=True).first() or 0) + 1
+    comment_counts = [
+        min(int(rng.expovariate(1 / comments_per_post)), 500)
+        if comments_per_post else 0
+        for _ in range(posts)]
+
+    def make_posts():
+        for n in range(posts):
+            roll = rng.random()
+            post = Post(
+                id=first_post_id + n,
+                title=text(rng, 4).capitalize(),
+                text=text(rng, rng.randint(20, 300)),
+                pub_date=(now + timedelta(days=rng.randint(1, 30))
+                          if roll > 0.95
+                          else now - timedelta(minutes=posts - n)),
+                is_published=roll < 0.9 or roll > 0.95,
+                author_id=(author.id if n % 50 == 0
+                           else rng.choice(user_ids)),
+                category_id=(category_ids[0] if n % 7 == 0
+                             else rng.choice(category_ids)),
+                location_id=rng.choice(location_ids + [None]),
+                comment_count=comment_counts[n])
+            render_post(post)
+            yield post
+
+    batched(make_posts(), Post)
+
+    def make_comments():
+        for n, count in enumerate(comment_counts):
+            for _ in range(count):
+                yield Comment(post_id=first_post_id + n,
+                              author_id=rng.choice(user_ids),
+                              text=text(rng, rng.randint(3, 40)))
+
+    batched(make_comments(), Comment)
+    rebuild_feed()
+    rebuild_search_index()
+    if verbose:
+        print(f'Создано публикаций: {posts}, комментариев: '
+              f'{sum(comment_counts)}, пользователей: {users} за '
+              f'{time.perf_counter() - started:.1f} с')
+    return author, Category.objects.get(pk=category_ids[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--comments-per-post', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--db', help='Файл SQLite для заполнения.')
+    args = parser.parse_args()
+    bootstrap.setup_database(args.db)
+    seed(args.posts, args.comments_per_post, args.seed)
+
+
+if __name__ == '__main__':
+    main()
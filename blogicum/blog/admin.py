@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Category, Location, Post
+from .models import Category, ImageJob, Location, Post
 
 
 admin.site.empty_value_display = 'Не задано'
@@ -14,9 +14,23 @@ class PostAdmin(admin.ModelAdmin):
         'pub_date',
         'author',
         'location',
-        'category'
+        'category',
+        'comment_count',
     )
 
 
+@admin.register(ImageJob)
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'post',
+        'status',
+        'attempts',
+        'created_at',
+        'started_at',
+        'finished_at',
+    )
+    list_filter = ('status',)
+
+
 admin.site.register(Category)
 admin.site.register(Location)
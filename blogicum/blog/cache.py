@@ -0,0 +1,204 @@
+import threading
+import time
+from collections import OrderedDict
+from hashlib import md5
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+
+INDEX_FEED = 'index'
+
+POST_CARD_VERSION_KEY = 'blog:post-card-version'
+
+PROFILE_FIELDS = ('id', 'username', 'first_name', 'last_name', 'is_staff',
+                  'date_joined')
+
+
+def page_cache():
+    return caches[settings.BLOG_PAGE_CACHE_ALIAS]
+
+
+def category_feed(slug):
+    return f'category:{slug}'
+
+
+def profile_feed(username):
+    return f'profile:{username}'
+
+
+def _get_or_add_version(cache, key):
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _feed_version_key(feed):
+    return f'blog:feed-version:{feed}'
+
+
+def get_feed_version(feed):
+    """Текущая версия ленты; входит в ключ каждой её страницы.
+
+    Версия — отметка времени, а не счётчик: если ключ версии будет
+    вытеснен из кэша, новая версия не совпадёт ни с одной из старых.
+    """
+    return _get_or_add_version(page_cache(), _feed_version_key(feed))
+
+
+def _bump_feed_versions(feeds):
+    page_cache().set_many(
+        {_feed_version_key(feed): time.time_ns() for feed in feeds}, None)
+
+
+def invalidate_feeds(feeds):
+    """Сбрасывает закэшированные страницы перечисленных лент.
+
+    Внутри транзакции версии сбрасываются ещё раз после фиксации, чтобы
+    отбросить страницы, отрисованные по данным до её завершения.
+    """
+    feeds = set(feeds)
+    if not feeds:
+        return
+    _bump_feed_versions(feeds)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump_feed_versions(feeds))
+
+
+def feed_count_key(feed):
+    return f'blog:feed-count:{feed}'
+
+
+def invalidate_feed_counts(feeds):
+    """Сбрасывает закэшированное число публикаций в лентах"""
+    keys = [feed_count_key(feed) for feed in feeds]
+    page_cache().delete_many(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: page_cache().delete_many(keys))
+
+
+def page_cache_key(feed, request):
+    url_hash = md5(request.get_full_path().encode()).hexdigest()
+    return f'blog:page:{feed}:{url_hash}', get_feed_version(feed)
+
+
+def post_card_cache():
+    return caches[settings.BLOG_POST_CARD_CACHE_ALIAS]
+
+
+def get_post_card_version():
+    """Общая версия фрагментов карточек публикаций.
+
+    Помимо неё ключ карточки содержит id, отметку изменения публикации и
+    число комментариев; версия сбрасывается при изменении данных, которые
+    карточка берёт из связанных моделей (категории, места, автора).
+    """
+    return _get_or_add_version(post_card_cache(), POST_CARD_VERSION_KEY)
+
+
+def invalidate_post_cards():
+    post_card_cache().set(POST_CARD_VERSION_KEY, time.time_ns(), None)
+
+
+class LocalTTLCache:
+    """Кэш в памяти процесса: LRU ограниченного размера с временем жизни.
+
+    Сбрасывается только в своём процессе, поэтому в остальных процессах
+    устаревшие значения живут не дольше ttl секунд.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._data)}
+
+
+category_cache = LocalTTLCache(
+    settings.BLOG_CATEGORY_CACHE_SIZE, settings.BLOG_CATEGORY_CACHE_TTL)
+
+
+def get_published_category(slug):
+    """Опубликованная категория по slug или None"""
+    from .models import Category
+
+    category = category_cache.get(slug)
+    if category is None:
+        category = Category.objects.filter(
+            slug=slug, is_published=True).first()
+        if category is not None:
+            category_cache.set(slug, category)
+    return category
+
+
+profile_cache = LocalTTLCache(
+    settings.BLOG_PROFILE_CACHE_SIZE, settings.BLOG_PROFILE_CACHE_TTL)
+
+
+def _profile_key(username):
+    return f'blog:profile:{username}'
+
+
+def get_profile(username):
+    """Пользователь с данными шапки профиля по username или None.
+
+    Данные ищутся в кэше процесса, затем в общем кэше и только потом в
+    базе. Возвращается несохранённый экземпляр User только с полями
+    PROFILE_FIELDS: его хватает для шапки и сравнения с request.user.
+    """
+    User = get_user_model()
+    data = profile_cache.get(username)
+    if data is None:
+        shared = caches[settings.BLOG_PROFILE_CACHE_ALIAS]
+        data = shared.get(_profile_key(username))
+        if data is None:
+            data = (User.objects.filter(username=username)
+                    .values(*PROFILE_FIELDS).first())
+            if data is None:
+                return None
+            shared.set(_profile_key(username), data,
+                       settings.BLOG_PROFILE_CACHE_TIMEOUT)
+        profile_cache.set(username, data)
+    return User(**data)
+
+
+def invalidate_profiles(usernames):
+    caches[settings.BLOG_PROFILE_CACHE_ALIAS].delete_many(
+        [_profile_key(username) for username in usernames])
+    for username in usernames:
+        profile_cache.delete(username)
@@ -0,0 +1,27 @@
+"""Системные проверки настроек блога"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PROCESS_LOCAL_CACHES = frozenset({
+    'django.core.cache.backends.locmem.LocMemCache',
+})
+
+
+@register()
+def check_page_cache_is_shared(app_configs, **kwargs):
+    """Кэш страниц должен быть общим для всех процессов сайта.
+
+    В нём лежат версии лент и состояние планировщика (blog.scheduler):
+    кэш в памяти процесса не узнаёт о сбросах из других процессов.
+    """
+    backend = settings.CACHES[settings.BLOG_PAGE_CACHE_ALIAS]['BACKEND']
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [Warning(
+        'Кэш страниц BLOG_PAGE_CACHE_ALIAS хранится в памяти процесса.',
+        hint=("Если сайт работает в нескольких процессах, выберите "
+              "BLOG_PAGE_CACHE_BACKEND 'filesystem' или 'redis': иначе "
+              'процессы не видят сброс страниц и отложенных публикаций '
+              'друг друга.'),
+        id='blog.W001',
+    )]
@@ -0,0 +1,254 @@
+"""Потоковая загрузка дампов в формате dumpdata (JSON).
+
+loaddata читает файл целиком в память и сохраняет объекты по одному:
+на каждый объект приходится SELECT, INSERT или UPDATE и сигналы модели.
+Здесь массив объектов разбирается по мере чтения файла, объекты
+копятся в буферах по моделям и записываются порциями: одним запросом
+узнаются уже существующие первичные ключи порции, новые строки
+вставляются пакетным INSERT, существующие обновляются bulk_update.
+
+Как и loaddata, загрузка идёт в одной транзакции, а внешние ключи
+проверяются один раз в конце, поэтому порядок моделей в дампе не важен.
+Значения полей пишутся как есть (raw): auto_now и auto_now_add не
+подменяют даты из дампа. Сигнал pre_save отправляется с raw=True, как
+при loaddata, а post_save — нет: производные данные (ленту, поисковый
+индекс, счётчики) нужно пересобрать после загрузки. У каждого объекта
+дампа должен быть первичный ключ.
+"""
+import json
+import re
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import pre_save
+
+BATCH_SIZE = 1000
+
+CHUNK_SIZE = 64 * 1024
+
+WHITESPACE_RE = re.compile(r'\s*')
+
+
+class _ChunkReader:
+    """Текст файла, дочитываемый порциями по мере разбора"""
+
+    def __init__(self, file, chunk_size):
+        self.chunks = iter(partial(file.read, chunk_size), '')
+        self.decoder = json.JSONDecoder()
+        self.buffer, self.position = '', 0
+
+    def read_more(self):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self):
+        """Следующий непробельный символ или None в конце файла"""
+        while True:
+            self.position = WHITESPACE_RE.match(
+                self.buffer, self.position).end()
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                return None
+
+    def expect(self, chars):
+        char = self.peek()
+        if char is None:
+            raise ValueError('Дамп оборвался до конца массива объектов.')
+        if char not in chars:
+            raise ValueError(
+                f'Неожиданный символ {char!r} в дампе, ожидался один из '
+                f'{chars!r}.')
+        self.position += 1
+        return char
+
+    def read_object(self):
+        if self.peek() != '{':
+            raise ValueError('Элементами дампа должны быть объекты JSON.')
+        while True:
+            try:
+                item, self.position = self.decoder.raw_decode(
+                    self.buffer, self.position)
+                return item
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+
+
+def iter_json_array(file, chunk_size=CHUNK_SIZE):
+    """Объекты JSON-массива из файла, читаемого порциями по chunk_size.
+
+    В памяти держится только непрочитанный остаток порции и текущий
+    объект. Элементами массива должны быть объекты JSON: незавершённый
+    объект на границе порции не разбирается, пока не дочитан целиком.
+    """
+    reader = _ChunkReader(file, chunk_size)
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.position += 1
+    else:
+        while True:
+            yield reader.read_object()
+            if reader.expect(',]') == ']':
+                break
+    if reader.peek() is not None:
+        raise ValueError('Лишние данные в дампе после массива объектов.')
+
+
+def fill_missing_dates(objects, fields):
+    """Даты auto_now и auto_now_add, которых нет в дампе, — текущее время.
+
+    Такие поля появляются в моделях после снятия дампа; при raw-вставке
+    они остались бы пустыми.
+    """
+    dates = [field for field in fields
+             if getattr(field, 'auto_now', False)
+             or getattr(field, 'auto_now_add', False)]
+    for obj in objects:
+        for field in dates:
+            if getattr(obj, field.attname) is None:
+                field.pre_save(obj, add=True)
+
+
+class DumpLoader:
+    """Буферы объектов по моделям и их запись порциями.
+
+    before_write, если задан, вызывается перед записью каждой порции с
+    моделью, её объектами и множеством первичных ключей, уже лежащих в
+    базе: прежние значения этих строк ещё можно прочитать. progress
+    вызывается после записи порции с меткой модели, числом записанных
+    объектов этой модели и общим числом загруженных объектов.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE,
+                 progress=None, before_write=None):
+        self.using = using
+        self.connection = connections[using]
+        self.batch_size = batch_size
+        self.progress = progress
+        self.before_write = before_write
+        self.buffers = defaultdict(list)
+        self.relations = defaultdict(list)
+        self.counts = Counter()
+        self.models = set()
+        self.inserted = self.updated = 0
+
+    def add(self, deserialized):
+        model = type(deserialized.object)
+        if model._meta.parents:
+            raise ValueError(
+                f'{model._meta.label}: модели с наследованием таблиц '
+                'загружайте командой loaddata.')
+        if deserialized.object.pk is None:
+            raise ValueError(
+                f'{model._meta.label}: у объекта дампа нет первичного '
+                'ключа.')
+        buffer = self.buffers[model]
+        buffer.append(deserialized)
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        batch = self.buffers.pop(model, [])
+        if not batch:
+            return
+        objects = [item.object for item in batch]
+        fields = model._meta.local_concrete_fields
+        for obj in objects:
+            pre_save.send(sender=model, instance=obj, raw=True,
+                          using=self.using, update_fields=None)
+        manager = model._base_manager.db_manager(self.using)
+        existing = set(manager.filter(
+            pk__in=[obj.pk for obj in objects]).values_list('pk', flat=True))
+        new = [obj for obj in objects if obj.pk not in existing]
+        old = [obj for obj in objects if obj.pk in existing]
+        fill_missing_dates(objects, fields)
+        if self.before_write:
+            self.before_write(model, objects, existing)
+        if new:
+            # bulk_create() вызывает pre_save() полей и перезаписал бы
+            # даты auto_now_add; raw-вставка — та же, что у save(raw=True)
+            size = self.connection.ops.bulk_batch_size(fields, new) or 1
+            for start in range(0, len(new), size):
+                manager._insert(new[start:start + size], fields=fields,
+                                using=self.using, raw=True)
+        if old:
+            manager.bulk_update(
+                old, [field.name for field in fields if not field.primary_key],
+                batch_size=self.batch_size)
+        self.models.add(model)
+        self.collect_relations(model, batch, existing)
+        self.inserted += len(new)
+        self.updated += len(old)
+        self.counts[model._meta.label] += len(batch)
+        if self.progress:
+            self.progress(model._meta.label, self.counts[model._meta.label],
+                          self.inserted + self.updated)
+
+    def collect_relations(self, model, batch, existing):
+        """Связи многие-ко-многим порции: прежние связи объектов заменяются"""
+        for name in {name for item in batch for name in item.m2m_data}:
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = through._meta.get_field(field.m2m_field_name()).attname
+            target = through._meta.get_field(
+                field.m2m_reverse_field_name()).attname
+            if existing:
+                through._base_manager.using(self.using).filter(
+                    **{f'{source}__in': existing}).delete()
+            rows = self.relations[through]
+            for item in batch:
+                rows.extend(through(**{source: item.object.pk, target: pk})
+                            for pk in item.m2m_data.get(name, ()))
+            if len(rows) >= self.batch_size:
+                self.flush_relations(through)
+
+    def flush_relations(self, through):
+        rows = self.relations.pop(through, [])
+        self.models.add(through)
+        through._base_manager.using(self.using).bulk_create(
+            rows, batch_size=self.batch_size)
+
+    def finish(self):
+        """Записывает остатки буферов"""
+        for model in list(self.buffers):
+            self.flush(model)
+        for through in list(self.relations):
+            self.flush_relations(through)
+
+    def check(self):
+        """Проверяет внешние ключи и сдвигает последовательности ключей"""
+        tables = [model._meta.db_table for model in self.models]
+        self.connection.check_constraints(table_names=tables)
+        statements = self.connection.ops.sequence_reset_sql(
+            no_style(), list(self.models))
+        if statements:
+            with self.connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+
+def load_dump(file, using=DEFAULT_DB_ALIAS, batch_size=BATCH_SIZE,
+              progress=None, before_write=None, chunk_size=CHUNK_SIZE):
+    """Загружает дамп из открытого текстового файла.
+
+    Возвращает DumpLoader: counts — число объектов по меткам моделей,
+    inserted и updated — число вставленных и обновлённых строк.
+    """
+    loader = DumpLoader(using, batch_size, progress, before_write)
+    objects = serializers.deserialize(
+        'python', iter_json_array(file, chunk_size), using=using)
+    with transaction.atomic(using=using):
+        with connections[using].constraint_checks_disabled():
+            for deserialized in objects:
+                loader.add(deserialized)
+            loader.finish()
+        loader.check()
+    return loader
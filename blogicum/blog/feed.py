@@ -0,0 +1,87 @@
+"""Материализованная лента видимых публикаций.
+
+Таблица FeedEntry содержит по строке на каждую публикацию с
+is_published=True в опубликованной категории: ключи категории и автора,
+pub_date и число комментариев. Ленты читают её одним проходом по индексу
+(..., pub_date, post) без соединения с категориями и без проверки флагов.
+
+Отложенные публикации тоже хранятся в таблице: их скрывает граница
+pub_date <= горизонт публикаций (см. blog.scheduler), поэтому выход
+поста в срок не требует записи в ленту. Строки обновляют сигналы
+публикаций, категорий и комментариев; команда rebuild_feed пересобирает
+таблицу целиком.
+"""
+from django.db import connections, router, transaction
+from django.db.models import F
+
+from .models import FeedEntry, Post
+
+BATCH_SIZE = 1000
+
+
+def feed_rows(posts):
+    """Строки ленты для видимых публикаций из posts"""
+    rows = (posts.filter(is_published=True, category__is_published=True)
+            .order_by()
+            .values_list('pk', 'category_id', 'author_id', 'pub_date',
+                         'comment_count'))
+    return [
+        FeedEntry(post_id=pk, category_id=category_id, author_id=author_id,
+                  pub_date=pub_date, comment_count=comment_count)
+        for pk, category_id, author_id, pub_date, comment_count in rows
+    ]
+
+
+def sync_feed(posts, using=None):
+    """Приводит строки ленты публикаций posts к их текущему состоянию.
+
+    using — база, в которой лежат posts и лента; по умолчанию её выбирает
+    роутер. Возвращает число видимых публикаций среди posts.
+    """
+    entries = FeedEntry.objects.using(using)
+    with transaction.atomic(using=using):
+        entries.filter(post__in=posts.values('pk')).delete()
+        rows = feed_rows(posts)
+        entries.bulk_create(rows, batch_size=BATCH_SIZE)
+    return len(rows)
+
+
+def sync_post(post_id):
+    sync_feed(Post.objects.filter(pk=post_id))
+
+
+def change_comment_count(post_id, delta):
+    """Сдвигает число комментариев в строке ленты вслед за Post"""
+    entries = FeedEntry.objects.filter(post_id=post_id)
+    if delta < 0:
+        entries = entries.filter(comment_count__gte=-delta)
+    entries.update(comment_count=F('comment_count') + delta)
+
+
+def rebuild_feed(batch_size=BATCH_SIZE, using=None):
+    """Пересобирает ленту базы using порциями по первичному ключу.
+
+    Каждая порция заменяется в своей транзакции, поэтому ленты остаются
+    доступны на всё время пересборки. В SQLite затем обновляется
+    статистика таблицы, по которой оцениваются большие ленты
+    (blog.pagination.estimate_rows). Возвращает число строк в ленте.
+    """
+    posts = Post.objects.using(using)
+    last_pk = 0
+    total = 0
+    while True:
+        pks = list(posts.filter(pk__gt=last_pk)
+                   .order_by('pk')
+                   .values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            analyze_feed(using)
+            return total
+        last_pk = pks[-1]
+        total += sync_feed(posts.filter(pk__in=pks), using)
+
+
+def analyze_feed(using=None):
+    connection = connections[using or router.db_for_write(FeedEntry)]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {FeedEntry._meta.db_table}')
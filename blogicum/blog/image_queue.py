@@ -0,0 +1,157 @@
+"""Очередь создания копий изображений вне HTTP-запроса.
+
+Сохранение публикации с новым изображением только ставит задачу
+ImageJob; копии создаёт команда process_images, запущенная отдельным
+процессом (их можно запустить несколько: задачи захватываются условным
+UPDATE). Пока копий нет, шаблоны выводят оригинал.
+
+Задача, зависшая в состоянии «выполняется» дольше BLOG_IMAGE_JOB_TIMEOUT
+секунд (например, процесс обработки упал), возвращается в очередь;
+после BLOG_IMAGE_JOB_ATTEMPTS неудачных попыток она помечается ошибкой.
+"""
+import json
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .images import update_renditions
+from .models import ImageJob, Post
+
+logger = logging.getLogger('blog.images')
+
+
+def enqueue_renditions(post, created=False):
+    """Ставит публикацию в очередь, если её задачи там ещё нет.
+
+    У только что созданной публикации задач быть не может, и проверка
+    пропускается.
+    """
+    if created or not ImageJob.objects.filter(
+            post=post, status=ImageJob.PENDING).exists():
+        ImageJob.objects.create(post=post)
+
+
+def requeue_stalled(now):
+    ImageJob.objects.filter(
+        status=ImageJob.RUNNING,
+        started_at__lt=now - timedelta(
+            seconds=settings.BLOG_IMAGE_JOB_TIMEOUT),
+    ).update(status=ImageJob.PENDING)
+
+
+def claim_job():
+    """Захватывает самую старую задачу очереди или возвращает None"""
+    now = timezone.now()
+    requeue_stalled(now)
+    pending = ImageJob.objects.filter(status=ImageJob.PENDING)
+    while True:
+        job = pending.order_by('created_at', 'pk').first()
+        if job is None:
+            return None
+        claimed = pending.filter(pk=job.pk).update(
+            status=ImageJob.RUNNING, started_at=now,
+            attempts=F('attempts') + 1)
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def process_job(job):
+    """Создаёт копии для задачи и записывает её итог в журнал blog.images.
+
+    Задача удалённой публикации удаляется вместе с ней: тогда
+    возвращается None.
+    """
+    started = time.perf_counter()
+    post = Post.objects.filter(pk=job.post_id).first()
+    if post is None:
+        return None
+    try:
+        if post.image and not update_renditions(post):
+            raise ValueError(f'Не удалось прочитать {post.image.name}')
+    except Exception as error:
+        job.error = str(error)
+        job.status = (ImageJob.FAILED
+                      if job.attempts >= settings.BLOG_IMAGE_JOB_ATTEMPTS
+                      else ImageJob.PENDING)
+    else:
+        job.error = ''
+        job.status = ImageJob.DONE
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error', 'finished_at'])
+    record = {
+        'post': job.post_id,
+        'status': job.status,
+        'attempt': job.attempts,
+        'processing_ms': round((time.perf_counter() - started) * 1000, 2),
+        'wait_ms': round(
+            (job.started_at - job.created_at).total_seconds() * 1000, 2),
+        'queue_depth': queue_depth(),
+    }
+    logger.log(
+        logging.INFO if job.status == ImageJob.DONE else logging.WARNING,
+        json.dumps(record, ensure_ascii=False),
+        extra={'image_job': record})
+    return record
+
+
+def process_pending(limit=None):
+    """Обрабатывает задачи, пока очередь не опустеет или не наберётся limit.
+
+    Возвращает записи о выполненных задачах.
+    """
+    records = []
+    while limit is None or len(records) < limit:
+        job = claim_job()
+        if job is None:
+            break
+        record = process_job(job)
+        if record is not None:
+            records.append(record)
+    return records
+
+
+def queue_depth():
+    return ImageJob.objects.filter(status=ImageJob.PENDING).count()
+
+
+def queue_stats():
+    """Метрики очереди для мониторинга.
+
+    Глубина очереди по состояниям, возраст старейшей ожидающей задачи и
+    время ожидания и обработки последних BLOG_IMAGE_STATS_WINDOW
+    выполненных задач в миллисекундах.
+    """
+    now = timezone.now()
+    counts = dict(ImageJob.objects.values_list('status')
+                  .annotate(total=Count('pk')).order_by())
+    oldest = (ImageJob.objects.filter(status=ImageJob.PENDING)
+              .aggregate(oldest=Min('created_at'))['oldest'])
+    recent = list(
+        ImageJob.objects.filter(status=ImageJob.DONE)
+        .order_by('-finished_at')
+        .values_list('created_at', 'started_at', 'finished_at')
+        [:settings.BLOG_IMAGE_STATS_WINDOW])
+    processing = sorted(
+        (finished - started).total_seconds() * 1000
+        for _, started, finished in recent)
+    waiting = [(started - created).total_seconds() * 1000
+               for created, started, _ in recent]
+    return {
+        'pending': counts.get(ImageJob.PENDING, 0),
+        'running': counts.get(ImageJob.RUNNING, 0),
+        'failed': counts.get(ImageJob.FAILED, 0),
+        'oldest_pending_s': (round((now - oldest).total_seconds(), 1)
+                             if oldest else None),
+        'processing_ms_avg': (round(sum(processing) / len(processing), 2)
+                              if processing else None),
+        'processing_ms_p95': (
+            round(processing[int((len(processing) - 1) * 0.95)], 2)
+            if processing else None),
+        'wait_ms_avg': (round(sum(waiting) / len(waiting), 2)
+                        if waiting else None),
+    }
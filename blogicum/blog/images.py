@@ -0,0 +1,147 @@
+"""Уменьшенные копии изображений публикаций.
+
+Для каждой копии из BLOG_IMAGE_RENDITIONS рядом с оригиналом
+сохраняются два файла: <имя>.<копия>.<хеш>.jpg (или .png для изображений
+с прозрачностью) и <имя>.<копия>.<хеш>.webp, где хеш — начало SHA-256
+содержимого. Файл с таким именем никогда не меняется, и blog.media
+отдаёт его с долгим Cache-Control. Если оригинал не шире копии, он
+не увеличивается: вместо JPEG/PNG используется сам оригинал, а WebP
+кодируется в исходном размере. Описание копий с их размерами хранится в
+Post.image_renditions, поэтому шаблонам не нужно открывать файлы.
+"""
+import hashlib
+import logging
+import os
+import re
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger('blog.images')
+
+
+DIGEST_LENGTH = 12
+
+
+def rendition_name(name, label, extension, content):
+    root, _ = os.path.splitext(name)
+    digest = hashlib.sha256(content).hexdigest()[:DIGEST_LENGTH]
+    return f'{root}.{label}.{digest}.{extension}'
+
+
+def is_rendition_name(name):
+    """Имя копии с хешем содержимого: файл под ним не меняется"""
+    labels = '|'.join(map(re.escape, settings.BLOG_IMAGE_RENDITIONS))
+    return re.search(
+        rf'\.(?:{labels})\.[0-9a-f]{{{DIGEST_LENGTH}}}\.\w+$',
+        name) is not None
+
+
+def save_image(storage, name, label, extension, image, image_format,
+               **options):
+    """Сохраняет копию label изображения name и возвращает её имя.
+
+    Копия с тем же содержимым уже лежит под тем же именем, её
+    перезапись пропускается.
+    """
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    content = buffer.getvalue()
+    target = rendition_name(name, label, extension, content)
+    if storage.exists(target):
+        return target
+    return storage.save(target, ContentFile(content))
+
+
+def has_alpha(image):
+    return (image.mode in ('RGBA', 'LA')
+            or image.mode == 'P' and 'transparency' in image.info)
+
+
+def make_renditions(field_file):
+    """Создаёт копии изображения и возвращает их описание.
+
+    Описание: {'original': {'name', 'width', 'height'},
+    <копия>: {'name', 'webp', 'width', 'height'}}. Если файл не удаётся
+    прочитать как изображение, возвращается пустой словарь и шаблоны
+    выводят оригинал.
+    """
+    storage = field_file.storage
+    try:
+        with storage.open(field_file.name, 'rb') as original:
+            with Image.open(original) as source:
+                image = ImageOps.exif_transpose(source)
+                image.load()
+    except (OSError, ValueError) as error:
+        logger.warning('Не удалось прочитать %s: %s', field_file.name, error)
+        return {}
+    if has_alpha(image):
+        image, image_format, extension = image.convert('RGBA'), 'PNG', 'png'
+        options = {'optimize': True}
+    else:
+        image, image_format, extension = image.convert('RGB'), 'JPEG', 'jpg'
+        options = {'quality': settings.BLOG_IMAGE_QUALITY,
+                   'optimize': True, 'progressive': True}
+    renditions = {'original': {'name': field_file.name,
+                               'width': image.width,
+                               'height': image.height}}
+    for label, width in settings.BLOG_IMAGE_RENDITIONS.items():
+        if image.width > width:
+            resized = image.resize(
+                (width, round(image.height * width / image.width)),
+                Image.Resampling.LANCZOS)
+            name = save_image(
+                storage, field_file.name, label, extension,
+                resized, image_format, **options)
+        else:
+            resized, name = image, field_file.name
+        renditions[label] = {
+            'name': name,
+            'webp': save_image(
+                storage, field_file.name, label, 'webp',
+                resized, 'WEBP', quality=settings.BLOG_IMAGE_WEBP_QUALITY),
+            'width': resized.width,
+            'height': resized.height,
+        }
+    return renditions
+
+
+def delete_renditions(storage, renditions):
+    """Удаляет файлы копий; оригинал не трогает"""
+    original = renditions['original']['name']
+    for label, rendition in renditions.items():
+        if label == 'original':
+            continue
+        for name in (rendition['name'], rendition['webp']):
+            if name != original:
+                storage.delete(name)
+
+
+def store_renditions(post_id, image_name, renditions):
+    """Записывает описание копий публикации и сбрасывает её страницы.
+
+    Описание записывается, только если изображение публикации всё ещё
+    image_name. updated_at меняется вместе с ним: он входит в ключ кэша
+    карточки, так что карточка перерисуется уже с копиями.
+    """
+    from .cache import invalidate_feeds
+    from .models import Post
+    from .signals import posts_feeds
+
+    posts = Post.objects.filter(pk=post_id)
+    posts.filter(image=image_name).update(
+        image_renditions=renditions, updated_at=timezone.now())
+    invalidate_feeds(posts_feeds(posts))
+
+
+def update_renditions(post):
+    """Пересоздаёт копии изображения публикации"""
+    if post.image_renditions:
+        delete_renditions(post.image.storage, post.image_renditions)
+    renditions = make_renditions(post.image) if post.image else {}
+    store_renditions(post.pk, post.image.name, renditions)
+    post.image_renditions = renditions
+    return renditions
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import update_renditions
+from blog.models import Post
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = ('Создаёт уменьшенные копии изображений публикаций, у которых '
+            'их ещё нет.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать копии и у публикаций, где они уже есть.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Сколько публикаций читать из базы за один запрос.')
+
+    def handle(self, *args, **options):
+        posts = (Post.objects.exclude(image='')
+                 .only('id', 'image', 'image_renditions')
+                 .order_by('pk'))
+        created = failed = 0
+        for post in posts.iterator(chunk_size=options['chunk_size']):
+            if post.image_renditions and not options['force']:
+                continue
+            if update_renditions(post):
+                created += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Копии созданы: {created}, не удалось прочитать: {failed}'))
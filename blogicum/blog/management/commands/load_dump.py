@@ -0,0 +1,120 @@
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.base import DeserializationError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections
+
+from blog.cache import (
+    category_cache, invalidate_post_cards, invalidate_profiles, page_cache
+)
+from blog.dumps import BATCH_SIZE, load_dump
+from blog.models import Category, Comment, Location, Post
+from blog.scheduler import publish_due
+
+PROGRESS_INTERVAL = 1.0
+
+
+class Command(BaseCommand):
+    help = ('Загружает дамп dumpdata в формате JSON, разбирая его по мере '
+            'чтения и записывая объекты порциями; затем пересобирает '
+            'производные данные публикаций и сбрасывает кэши блога.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'dump', help='Путь к файлу дампа, «-» — стандартный ввод.')
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Сколько объектов одной модели записывать за раз.')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База, в которую загружается дамп.')
+        parser.add_argument(
+            '--no-rebuild', action='store_false', dest='rebuild',
+            help='Не пересобирать ленту, поисковый индекс и счётчики '
+                 'комментариев после загрузки.')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        self.database = options['database']
+        self.started = self.reported = time.perf_counter()
+        self.usernames = set()
+        try:
+            if options['dump'] == '-':
+                loader = self.load(sys.stdin, options)
+            else:
+                with open(options['dump'], encoding='utf-8') as file:
+                    loader = self.load(file, options)
+        except (OSError, ValueError, DeserializationError,
+                IntegrityError) as error:
+            raise CommandError(f'Дамп не загружен: {error}')
+        elapsed = time.perf_counter() - self.started
+        total = loader.inserted + loader.updated
+        for label, count in sorted(loader.counts.items()):
+            self.stdout.write(f'{label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} (новых {loader.inserted}, '
+            f'обновлено {loader.updated}) за {elapsed:.1f} с, '
+            f'{total / max(elapsed, 1e-6):.0f} объектов/с'))
+        if options['rebuild'] and loader.models & {
+                Post, Comment, Category, Location}:
+            self.rebuild(options)
+        self.invalidate_caches()
+
+    def load(self, file, options):
+        return load_dump(file, using=options['database'],
+                         batch_size=options['batch_size'],
+                         progress=self.report,
+                         before_write=self.remember_usernames)
+
+    def remember_usernames(self, model, objects, existing):
+        """Прежние и новые имена загружаемых пользователей.
+
+        По ним после загрузки сбрасывается кэш профилей: дамп может
+        переименовать пользователя, а post_save при загрузке не
+        отправляется.
+        """
+        if model is not get_user_model():
+            return
+        self.usernames.update(obj.username for obj in objects)
+        if existing:
+            self.usernames.update(
+                model._base_manager.using(self.database)
+                .filter(pk__in=existing)
+                .values_list('username', flat=True))
+
+    def report(self, label, count, total):
+        now = time.perf_counter()
+        if self.verbosity < 2 and now - self.reported < PROGRESS_INTERVAL:
+            return
+        self.reported = now
+        if self.verbosity:
+            rate = total / max(now - self.started, 1e-6)
+            self.stdout.write(
+                f'{label}: {count}, всего {total}, {rate:.0f} объектов/с')
+
+    def rebuild(self, options):
+        """Пересчитывает то, что при сохранении по одному делает post_save"""
+        kwargs = {'stdout': self.stdout, 'verbosity': self.verbosity,
+                  'database': self.database}
+        batch_size = options['batch_size']
+        call_command('recount_comments', chunk_size=batch_size, **kwargs)
+        call_command('rebuild_feed', batch_size=batch_size, **kwargs)
+        if connections[self.database].vendor == 'sqlite':
+            call_command('rebuild_search_index', batch_size=batch_size,
+                         **kwargs)
+
+    def invalidate_caches(self):
+        """Сбрасывает кэши после любой загрузки.
+
+        Страницы и карточки выводят имена авторов, категории и места, а
+        отложенные публикации из дампа должны попасть в состояние
+        планировщика, не дожидаясь BLOG_PUBLICATION_STATE_TTL.
+        """
+        invalidate_post_cards()
+        page_cache().clear()
+        category_cache.clear()
+        invalidate_profiles(self.usernames)
+        publish_due()
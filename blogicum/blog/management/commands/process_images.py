@@ -0,0 +1,45 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.image_queue import process_pending, queue_stats
+
+DEFAULT_SLEEP = 2
+
+
+class Command(BaseCommand):
+    help = ('Создаёт копии изображений публикаций из очереди ImageJob вне '
+            'HTTP-запросов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, ожидая новые задачи.')
+        parser.add_argument(
+            '--sleep', type=float, default=DEFAULT_SLEEP,
+            help='Пауза при пустой очереди в режиме --loop, с.')
+        parser.add_argument(
+            '--limit', type=int,
+            help='Обработать не больше стольких задач за проход.')
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Вывести метрики очереди в JSON и выйти.')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(queue_stats(), ensure_ascii=False))
+            return
+        while True:
+            records = process_pending(options['limit'])
+            for record in records:
+                self.stdout.write(
+                    f'Публикация {record["post"]}: {record["status"]}, '
+                    f'{record["processing_ms"]:.0f} мс, '
+                    f'в очереди {record["queue_depth"]}')
+            if not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Обработано задач: {len(records)}'))
+                return
+            if not records:
+                time.sleep(options['sleep'])
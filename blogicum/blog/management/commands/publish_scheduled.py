@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.scheduler import publish_due
+
+DEFAULT_MAX_SLEEP = 60
+
+
+class Command(BaseCommand):
+    help = ('Выпускает отложенные публикации, у которых наступил pub_date: '
+            'сдвигает горизонт публикаций и сбрасывает кэш затронутых лент.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Работать постоянно, просыпаясь к ближайшей публикации.')
+        parser.add_argument(
+            '--max-sleep', type=int, default=DEFAULT_MAX_SLEEP,
+            help='Наибольшая пауза между проверками в режиме --loop, с.')
+
+    def handle(self, *args, **options):
+        while True:
+            state = publish_due()
+            next_due = state['next_due']
+            if next_due is None:
+                message = 'отложенных публикаций нет'
+            else:
+                message = f'следующая публикация: {next_due:%Y-%m-%d %H:%M:%S}'
+            self.stdout.write(
+                f'Горизонт: {state["horizon"]:%Y-%m-%d %H:%M:%S}, {message}')
+            if not options['loop']:
+                return
+            sleep = options['max_sleep']
+            if next_due is not None:
+                until_due = (next_due - timezone.now()).total_seconds()
+                sleep = min(sleep, max(until_due, 0))
+            time.sleep(sleep)
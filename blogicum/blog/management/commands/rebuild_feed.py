@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.feed import BATCH_SIZE, rebuild_feed
+
+
+class Command(BaseCommand):
+    help = ('Пересобирает материализованную ленту FeedEntry из публикаций '
+            'порциями по первичному ключу.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество публикаций, обрабатываемых за одну транзакцию.')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База, в которой пересобирается лента.')
+
+    def handle(self, *args, **options):
+        total = rebuild_feed(options['batch_size'], options['database'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Публикаций в ленте: {total}'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from blog.search import BATCH_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = ('Пересобирает поисковый индекс публикаций, читая их порциями '
+            'по первичному ключу.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BATCH_SIZE,
+            help='Количество публикаций, читаемых за один запрос.')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База, в которой пересобирается индекс.')
+
+    def handle(self, *args, **options):
+        try:
+            total = rebuild_search_index(
+                options['batch_size'], connections[options['database']])
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Публикаций в поисковом индексе: {total}'))
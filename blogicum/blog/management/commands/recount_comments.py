@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count
+
+from blog.models import Comment, FeedEntry, Post
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает хранимый счётчик комментариев Post.comment_count '
+            'и его копию в ленте FeedEntry порциями по первичному ключу.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help='Количество публикаций, обрабатываемых за одну транзакцию.')
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База, в которой пересчитываются счётчики.')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        using = options['database']
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            posts = list(
+                Post.objects.using(using).filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'comment_count')[:chunk_size])
+            if not posts:
+                break
+            last_pk = posts[-1][0]
+            checked += len(posts)
+            fixed += self.recount_chunk(posts, using)
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено публикаций: {checked}, исправлено: {fixed}'))
+
+    @staticmethod
+    def recount_chunk(posts, using):
+        with transaction.atomic(using=using):
+            actual = dict(
+                Comment.objects.using(using)
+                .filter(post_id__in=[pk for pk, _ in posts])
+                .values_list('post_id')
+                .annotate(total=Count('id'))
+                .order_by())
+            stale = [
+                Post(pk=pk, comment_count=actual.get(pk, 0))
+                for pk, stored in posts
+                if actual.get(pk, 0) != stored
+            ]
+            Post.objects.using(using).bulk_update(stale, ['comment_count'])
+            FeedEntry.objects.using(using).bulk_update(
+                [FeedEntry(pk=post.pk, comment_count=post.comment_count)
+                 for post in stale],
+                ['comment_count'])
+        return len(stale)
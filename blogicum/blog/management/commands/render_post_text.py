@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_post_cards, page_cache
+from blog.models import Post
+from blog.rendering import render_post
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает отрывки и HTML текстов публикаций, например '
+            'после загрузки данных в обход модели или изменения '
+            'blog.rendering.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Сколько публикаций читать и обновлять за один запрос.')
+
+    def handle(self, *args, **options):
+        posts = (Post.objects.only('id', 'text', 'excerpt', 'text_html')
+                 .order_by('pk'))
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)
+                         [:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for post in batch:
+                stored = (post.excerpt, post.text_html)
+                render_post(post)
+                if (post.excerpt, post.text_html) != stored:
+                    changed.append(post)
+            Post.objects.bulk_update(changed, ['excerpt', 'text_html'])
+            updated += len(changed)
+        if updated:
+            invalidate_post_cards()
+            page_cache().clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено публикаций: {updated}'))
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.routers import copy_sqlite_database
+
+
+class Command(BaseCommand):
+    help = ('Копирует основную базу SQLite в файлы реплик из настройки '
+            'BLOG_DB_REPLICAS.')
+
+    def handle(self, *args, **options):
+        replicas = settings.BLOG_DB_REPLICAS
+        if not replicas:
+            raise CommandError('Реплики не заданы в BLOG_DB_REPLICAS.')
+        for alias in replicas:
+            target = settings.DATABASES[alias]['NAME']
+            try:
+                copy_sqlite_database(target)
+            except ValueError as error:
+                raise CommandError(error)
+            self.stdout.write(f'{alias}: скопировано в {target}')
+        self.stdout.write(self.style.SUCCESS('Реплики обновлены'))
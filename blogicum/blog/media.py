@@ -0,0 +1,157 @@
+"""Раздача загруженных файлов из MEDIA_ROOT.
+
+В отличие от django.views.static.serve ответ содержит ETag и
+Last-Modified: повторный запрос браузера с If-None-Match или
+If-Modified-Since получает 304 без тела. Поддерживаются запросы части
+файла (Range: bytes=...), по которым браузеры и прокси докачивают
+файлы. Копии изображений с хешем содержимого в имени (blog.images)
+отдаются с Cache-Control immutable на BLOG_MEDIA_IMMUTABLE_MAX_AGE
+секунд, остальные файлы — на BLOG_MEDIA_MAX_AGE с последующей
+проверкой по ETag.
+
+Если перед Django стоит веб-сервер, передачу файла можно отдать ему:
+BLOG_MEDIA_SENDFILE = 'x-sendfile' (Apache mod_xsendfile, lighttpd)
+или 'x-accel-redirect' (nginx, внутренний location
+BLOG_MEDIA_ACCEL_PREFIX). Тогда Django отвечает только заголовками,
+а Range обрабатывает сам веб-сервер.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse, Http404, HttpResponse, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .images import is_rendition_name
+
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(file_stat):
+    return f'"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+
+
+def parse_range(header, size):
+    """Первый и последний байт диапазона из заголовка Range.
+
+    None — заголовок не разобран или задаёт несколько диапазонов, файл
+    отдаётся целиком. ValueError — диапазон за пределами файла (416).
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        if not int(last):
+            raise ValueError(header)
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def range_allowed(request, etag, last_modified):
+    """Проверяет If-Range: часть отдаётся, только если файл не менялся"""
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def file_response(request, path, full_path, file_stat, etag, last_modified):
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    sendfile = settings.BLOG_MEDIA_SENDFILE
+    if sendfile:
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = (
+                settings.BLOG_MEDIA_ACCEL_PREFIX + quote(path))
+        else:
+            response['X-Sendfile'] = full_path
+    else:
+        size = file_stat.st_size
+        header = request.META.get('HTTP_RANGE')
+        try:
+            byte_range = (parse_range(header, size)
+                          if header and range_allowed(
+                              request, etag, last_modified)
+                          else None)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range is None:
+            response = FileResponse(
+                open(full_path, 'rb'), content_type=content_type)
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                read_range(full_path, start, end - start + 1),
+                status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+        response['Accept-Ranges'] = 'bytes'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """Отдаёт файл path из MEDIA_ROOT"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Файл не найден')
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404('Файл не найден')
+    etag = file_etag(file_stat)
+    last_modified = int(file_stat.st_mtime)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = file_response(
+            request, path, full_path, file_stat, etag, last_modified)
+        if response.status_code == 416:
+            return response
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if is_rendition_name(path):
+        patch_cache_control(
+            response, public=True, immutable=True,
+            max_age=settings.BLOG_MEDIA_IMMUTABLE_MAX_AGE)
+    else:
+        patch_cache_control(
+            response, public=True, max_age=settings.BLOG_MEDIA_MAX_AGE)
+    return response
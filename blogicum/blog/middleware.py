@@ -0,0 +1,128 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .routers import enable_replica_reads, replica_reads
+
+logger = logging.getLogger('blog.sql')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryStats:
+    """Счётчик SQL-запросов одного HTTP-запроса"""
+
+    def __init__(self, budget=None):
+        self.budget = budget
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.total_time += duration
+            if duration >= self.slowest_time:
+                self.slowest_time = duration
+                self.slowest_sql = sql
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.count > self.budget
+
+
+class QueryBudgetMiddleware:
+    """Учёт SQL-запросов каждого запроса к сайту.
+
+    Число запросов, их суммарное время и самый медленный запрос пишутся
+    в заголовки ответа X-SQL-* и в журнал blog.sql с именем представления
+    из resolver_match. Бюджет задаётся атрибутом query_budget класса
+    представления; при BLOG_QUERY_BUDGET_ENFORCE запрос сверх бюджета
+    завершается исключением QueryBudgetExceeded. Оно поднимается после
+    ответа представления, чтобы не прервать запись на середине.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.query_stats = stats = QueryStats()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        self.report(request, response, stats)
+        if stats.over_budget and settings.BLOG_QUERY_BUDGET_ENFORCE:
+            raise QueryBudgetExceeded(
+                f'Превышен бюджет SQL-запросов: {stats.count} > '
+                f'{stats.budget}')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        request.query_stats.budget = getattr(
+            view_class, 'query_budget', None)
+
+    @staticmethod
+    def report(request, response, stats):
+        match = request.resolver_match
+        record = {
+            'view': match.view_name if match else None,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.count,
+            'budget': stats.budget,
+            'sql_time_ms': round(stats.total_time * 1000, 2),
+            'slowest_ms': round(stats.slowest_time * 1000, 2),
+            'slowest_sql': stats.slowest_sql,
+        }
+        logger.log(logging.WARNING if stats.over_budget else logging.INFO,
+                   json.dumps(record, ensure_ascii=False),
+                   extra={'sql_stats': record})
+        if settings.BLOG_QUERY_STATS_HEADERS:
+            response['X-SQL-Queries'] = stats.count
+            response['X-SQL-Time-Ms'] = record['sql_time_ms']
+            response['X-SQL-Slowest-Ms'] = record['slowest_ms']
+
+
+class ReplicaRoutingMiddleware:
+    """Чтение с реплик для представлений с подсказкой read_from_replica.
+
+    Подсказка действует только для GET- и HEAD-запросов. После успешного
+    изменяющего запроса пользователь получает cookie BLOG_PRIMARY_COOKIE
+    на BLOG_READ_YOUR_WRITES_SECONDS секунд: пока она есть, его запросы
+    читают основную базу и видят собственные изменения, даже если копия
+    ещё не дошла до реплик.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with replica_reads(False):
+            response = self.get_response(request)
+        if (request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and response.status_code < 400):
+            response.set_cookie(
+                settings.BLOG_PRIMARY_COOKIE, '1',
+                max_age=settings.BLOG_READ_YOUR_WRITES_SECONDS,
+                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if (getattr(view_class, 'read_from_replica', False)
+                and request.method in ('GET', 'HEAD')
+                and settings.BLOG_PRIMARY_COOKIE not in request.COOKIES):
+            enable_replica_reads()
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_feed(apps, schema_editor):
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    Post = apps.get_model('blog', 'Post')
+    rows = (Post.objects.filter(is_published=True,
+                                category__is_published=True)
+            .values_list('pk', 'category_id', 'author_id', 'pub_date',
+                         'comment_count'))
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(post_id=pk, category_id=category_id, author_id=author_id,
+                   pub_date=pub_date, comment_count=comment_count)
+         for pk, category_id, author_id, pub_date, comment_count
+         in rows.iterator()),
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0006_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='blog.post', verbose_name='Публикация')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('author', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор публикации')),
+                ('category', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.category', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'строка ленты',
+                'verbose_name_plural': 'Лента публикаций',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['pub_date', 'post'], name='feed_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['category', 'pub_date', 'post'], name='feed_category_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['author', 'pub_date', 'post'], name='feed_author_pub_date_idx'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
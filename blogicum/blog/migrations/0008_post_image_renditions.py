@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_feedentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_renditions',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Копии изображения'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+SEARCH_TABLE = 'blog_post_search'
+
+
+def normalize(text):
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+        "title, text, tokenize='unicode61 remove_diacritics 2')")
+    Post = apps.get_model('blog', 'Post')
+    rows = (Post.objects.using(schema_editor.connection.alias)
+            .values_list('pk', 'title', 'text'))
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {SEARCH_TABLE}(rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [(pk, normalize(title), normalize(text))
+             for pk, title, text in rows])
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_imagejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
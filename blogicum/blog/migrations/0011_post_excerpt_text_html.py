@@ -0,0 +1,41 @@
+# Generated by Django 3.2.16 on 2026-10-17 07:34
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+
+def render_posts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.only('text').order_by('pk')
+    batch = []
+    for post in posts.iterator(chunk_size=1000):
+        post.excerpt = Truncator(
+            Truncator(post.text).words(10, truncate=' …')).chars(255)
+        post.text_html = str(linebreaksbr(post.text, autoescape=True))
+        batch.append(post)
+        if len(batch) == 1000:
+            Post.objects.bulk_update(batch, ['excerpt', 'text_html'])
+            batch = []
+    Post.objects.bulk_update(batch, ['excerpt', 'text_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Отрывок'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+    ]
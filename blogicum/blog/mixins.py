@@ -1,9 +1,22 @@
+from calendar import timegm
+from datetime import datetime, timezone
+from hashlib import md5
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.shortcuts import get_object_or_404, redirect
+from django.http import Http404
+from django.middleware.csrf import get_token
+from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
+from .cache import (get_feed_version, get_post_card_version, page_cache,
+                    page_cache_key)
 from .forms import CommentForm
 from .models import Comment, Post
+from .pagination import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .scheduler import get_publication_horizon
 
 
 class PostMixin:
@@ -21,20 +34,28 @@ class CommentMixin:
     form_class = CommentForm
 
 
-class CommentBaseViewMixin(CommentMixin, LoginRequiredMixin):
-    """Базовое представление для работы с комментариями"""
+class CheckAuthorMixin:
+    """Доступ к объекту только для его автора"""
 
-    pk_url_kwarg = 'comment_id'
+    _object = None
+
+    def get_object(self, queryset=None):
+        if self._object is None:
+            self._object = super().get_object(queryset)
+        return self._object
 
     def dispatch(self, request, *args, **kwargs):
-        comment = get_object_or_404(
-            Comment,
-            pk=kwargs['comment_id'],
-        )
-        if comment.author != request.user:
-            return redirect('blog:post_detail', id=kwargs['post_id'])
+        if self.get_object().author_id != request.user.pk:
+            return redirect('blog:post_detail', id=self.kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
+
+class CommentBaseViewMixin(CommentMixin, CheckAuthorMixin,
+                           LoginRequiredMixin):
+    """Базовое представление для работы с комментариями"""
+
+    pk_url_kwarg = 'comment_id'
+
     def get_success_url(self):
         return reverse('blog:post_detail',
                        kwargs={'id': self.kwargs['post_id']})
@@ -53,9 +74,142 @@ class PostDetailGetSuccessUrlMixin:
                        kwargs={'id': self.kwargs['post_id']})
 
 
-class CheckAuthorMixin:
+class PublicationHorizonMixin:
+    """Граница pub_date видимых публикаций, одна на весь запрос"""
+
+    publication_horizon = None
+
+    def get_publication_horizon(self):
+        if self.publication_horizon is None:
+            self.publication_horizon = get_publication_horizon()
+        return self.publication_horizon
+
+
+class FeedMixin(PublicationHorizonMixin):
+    """Имя ленты публикаций, которую выводит представление"""
+
+    feed = None
+
+    def get_feed(self):
+        return self.feed
+
+
+class PaginationModeMixin(FeedMixin):
+    """Выбор постраничной навигации: по номеру страницы или по курсору"""
+
+    pagination_mode = None
+    paginator_class = CachedCountPaginator
+    cursor_paginator_class = CursorPaginator
+    count_estimate = None
+    cursor_lookups = None
+
+    def get_pagination_mode(self):
+        return self.pagination_mode or settings.BLOG_PAGINATION_MODE
+
+    def get_cursor_lookups(self):
+        return self.cursor_lookups
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != 'cursor':
+            return super().paginate_queryset(queryset, page_size)
+        paginator = self.cursor_paginator_class(
+            queryset, page_size,
+            lookups=self.get_cursor_lookups())
+        try:
+            page = paginator.page(after=self.request.GET.get('after'),
+                                  before=self.request.GET.get('before'))
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset, per_page, feed=self.get_feed(),
+            count_estimate=self.count_estimate, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.get_pagination_mode() == 'cursor':
+            context['paginator_template'] = 'includes/cursor_paginator.html'
+        else:
+            context['paginator_template'] = 'includes/paginator.html'
+        return context
+
+
+class ConditionalGetMixin:
+    """Ответ 304 на повторный GET-запрос, если страница не изменилась"""
+
+    csrf_in_etag = False
+
+    def get_validators(self):
+        return None
 
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect('blog:post_detail', id=self.kwargs['post_id'])
-        return super().dispatch(request, *args, **kwargs)
+        validators = (self.get_validators()
+                      if request.method in ('GET', 'HEAD') else None)
+        if validators is None:
+            return super().dispatch(request, *args, **kwargs)
+        version, modified = validators
+        key = (version, request.user.pk, request.get_full_path())
+        if self.csrf_in_etag:
+            get_token(request)
+            key += (request.META['CSRF_COOKIE'],)
+        etag = 'W/"{}"'.format(md5(repr(key).encode()).hexdigest())
+        last_modified = timegm(modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        patch_cache_control(response, no_cache=True,
+                            private=request.user.is_authenticated)
+        return response
+
+
+class FeedConditionalGetMixin(ConditionalGetMixin, FeedMixin):
+    """Версия страницы ленты — версии ленты и карточек из кэша"""
+
+    def get_validators(self):
+        feed = self.get_feed()
+        if feed is None:
+            return None
+        self.get_publication_horizon()
+        versions = (get_feed_version(feed), get_post_card_version())
+        return versions, datetime.fromtimestamp(
+            max(versions) / 10**9, tz=timezone.utc)
+
+
+class AnonymousPageCacheMixin(FeedMixin):
+    """Кэширование страницы целиком для анонимных GET-запросов"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        self.get_publication_horizon()
+        cache = page_cache()
+        key, version = page_cache_key(self.get_feed(), request)
+        response = cache.get(key, version=version)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda rendered: cache.set(
+                    key, rendered, settings.BLOG_PAGE_CACHE_TIMEOUT,
+                    version=version))
+        return response
+
+
+class PostCardCacheMixin:
+    """Передаёт в шаблон параметры кэша фрагментов карточек публикаций"""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['post_card_cache_alias'] = settings.BLOG_POST_CARD_CACHE_ALIAS
+        context['post_card_cache_timeout'] = (
+            settings.BLOG_POST_CARD_CACHE_TIMEOUT)
+        context['post_card_version'] = get_post_card_version()
+        return context
@@ -2,6 +2,7 @@ from django.contrib.auth import get_user_model
 from django.db import models
 
 from core.models import PublishedModel
+from .rendering import EXCERPT_MAX_LENGTH
 from .utils import PublishedPostQuerySet
 
 TITLE_MAX_LENGTH = 256
@@ -47,6 +48,15 @@ class Post(PublishedModel):
         verbose_name='Заголовок',
         max_length=TITLE_MAX_LENGTH)
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.CharField(
+        verbose_name='Отрывок',
+        max_length=EXCERPT_MAX_LENGTH,
+        blank=True,
+        editable=False)
+    text_html = models.TextField(
+        verbose_name='Текст в HTML',
+        blank=True,
+        editable=False)
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
         help_text=('Если установить дату и время в будущем — можно делать '
@@ -71,11 +81,35 @@ class Post(PublishedModel):
         verbose_name='Категория',
     )
     image = models.ImageField('Изображение', blank=True)
+    image_renditions = models.JSONField(
+        verbose_name='Копии изображения',
+        default=dict,
+        editable=False)
+    updated_at = models.DateTimeField(
+        verbose_name='Изменено',
+        auto_now=True)
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0,
+        editable=False)
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-id']
+        indexes = [
+            models.Index(
+                fields=['pub_date'],
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx'),
+            models.Index(
+                fields=['category', 'pub_date'],
+                condition=models.Q(is_published=True),
+                name='post_category_pub_date_idx'),
+            models.Index(
+                fields=['author', 'pub_date'],
+                name='post_author_pub_date_idx'),
+        ]
 
     objects = PublishedPostQuerySet.as_manager()
 
@@ -83,6 +117,58 @@ class Post(PublishedModel):
         return self.title[:TITLE_LENGTH_OUTPUT]
 
 
+class FeedEntry(models.Model):
+    """Строка материализованной ленты публикаций.
+
+    Есть только у публикаций с is_published=True в опубликованной
+    категории; строки поддерживает модуль blog.feed.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_entry',
+        verbose_name='Публикация',
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='+',
+        verbose_name='Категория',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='+',
+        verbose_name='Автор публикации',
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата и время публикации')
+    comment_count = models.PositiveIntegerField(
+        verbose_name='Количество комментариев',
+        default=0)
+
+    class Meta:
+        verbose_name = 'строка ленты'
+        verbose_name_plural = 'Лента публикаций'
+        indexes = [
+            models.Index(
+                fields=['pub_date', 'post'],
+                name='feed_pub_date_idx'),
+            models.Index(
+                fields=['category', 'pub_date', 'post'],
+                name='feed_category_pub_date_idx'),
+            models.Index(
+                fields=['author', 'pub_date', 'post'],
+                name='feed_author_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'Строка ленты публикации {self.post_id}'
+
+
 class Comment(models.Model):
     text = models.TextField(verbose_name='Текст комментария')
     post = models.ForeignKey(Post, on_delete=models.CASCADE,
@@ -97,6 +183,65 @@ class Comment(models.Model):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ['created_at']
+        indexes = [
+            models.Index(
+                fields=['post', 'created_at'],
+                name='comment_post_created_at_idx'),
+        ]
 
     def __str__(self):
         return f'Комметарий пользователя {self.author}'
+
+
+class ImageJob(models.Model):
+    """Задача очереди на создание копий изображения публикации"""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация',
+    )
+    status = models.CharField(
+        verbose_name='Состояние',
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING)
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name='Попыток',
+        default=0)
+    error = models.TextField(verbose_name='Ошибка', blank=True)
+    created_at = models.DateTimeField(
+        verbose_name='Добавлено',
+        auto_now_add=True)
+    started_at = models.DateTimeField(
+        verbose_name='Начато',
+        null=True,
+        blank=True)
+    finished_at = models.DateTimeField(
+        verbose_name='Завершено',
+        null=True,
+        blank=True)
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Очередь изображений'
+        indexes = [
+            models.Index(
+                fields=['status', 'created_at'],
+                name='imagejob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'Изображение публикации {self.post_id}: {self.status}'
@@ -0,0 +1,233 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.utils.encoding import force_bytes, force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+from .cache import feed_count_key, page_cache
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def estimate_rows(index_name):
+    """Оценка числа строк индекса по статистике ANALYZE из sqlite_stat1.
+
+    Берётся только первое число статистики — строки во всём индексе.
+    Следующие числа — среднее на значение префикса столбцов, а не размер
+    конкретной ленты, поэтому для лент по категории или автору не годятся.
+    Статистику обновляет rebuild_feed(); устаревшую оценку поправляет
+    CachedCountPaginator. Возвращает None, если статистики нет.
+    """
+    if connection.vendor != 'sqlite':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            return None
+        cursor.execute(
+            'SELECT stat FROM sqlite_stat1 WHERE idx = %s', [index_name])
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    return int(row[0].split()[0])
+
+
+class WindowedPage(Page):
+    """Страница с ограниченным окном номеров для навигации"""
+
+    def elided_page_range(self):
+        """Первая, последняя и соседние с текущей страницы.
+
+        Число ссылок не зависит от длины ленты: пропуски отмечены
+        Paginator.ELLIPSIS.
+        """
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=self.paginator.page_window,
+            on_ends=self.paginator.page_window_ends)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который не считает COUNT(*) на каждый запрос.
+
+    Число публикаций ленты feed хранится в кэше страниц и сбрасывается
+    сигналами при публикации, снятии с публикации и удалении постов.
+    Если по статистике индекса count_estimate, в котором лежат все строки
+    ленты, она не меньше BLOG_FEED_COUNT_ESTIMATE_THRESHOLD, вместо
+    точного числа берётся оценка. Страница за её пределами, последняя
+    или неполная страница заменяют оценку точным числом.
+    """
+
+    page_window = 3
+    page_window_ends = 1
+    count_is_estimated = False
+
+    def __init__(self, object_list, per_page, feed=None,
+                 count_estimate=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.feed = feed
+        self.count_estimate = count_estimate
+
+    @cached_property
+    def count(self):
+        if self.feed is None:
+            return super().count
+        cache = page_cache()
+        key = feed_count_key(self.feed)
+        cached = cache.get(key)
+        if cached is None:
+            estimate = self.estimate_count()
+            if estimate is None:
+                cached = (super().count, False)
+            else:
+                cached = (estimate, True)
+            cache.set(key, cached, settings.BLOG_FEED_COUNT_TIMEOUT)
+        count, self.count_is_estimated = cached
+        return count
+
+    def use_exact_count(self):
+        """Пересчитывает ленту, если её размер был оценкой"""
+        if not self.count_is_estimated:
+            return
+        for name in ('count', 'num_pages'):
+            self.__dict__.pop(name, None)
+        count = super().count
+        page_cache().set(feed_count_key(self.feed), (count, False),
+                         settings.BLOG_FEED_COUNT_TIMEOUT)
+        self.count_is_estimated = False
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.count_is_estimated or int(number) < 1:
+                raise
+        self.use_exact_count()
+        return super().validate_number(number)
+
+    def page(self, number):
+        page = super().page(number)
+        if self.count_is_estimated and (
+                page.number == self.num_pages
+                or len(page.object_list) < self.per_page):
+            self.use_exact_count()
+            page = super().page(page.number)
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+    def estimate_count(self):
+        if self.count_estimate is None:
+            return None
+        estimate = estimate_rows(self.count_estimate)
+        if (estimate is None
+                or estimate < settings.BLOG_FEED_COUNT_ESTIMATE_THRESHOLD):
+            return None
+        return estimate
+
+
+class CursorPage:
+    """Страница, полученная по курсору: только ссылки вперёд и назад"""
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Постраничная навигация по ключу (key_field, id).
+
+    Вместо OFFSET и COUNT(*) страница выбирается условием на ключ
+    последней показанной записи, поэтому стоимость запроса не зависит
+    от глубины страницы. По умолчанию ключ — (pub_date, id) по убыванию.
+    lookups — пути (ключ, id) для сортировки и условий, если строки
+    выбираются по индексу связанной записи с теми же значениями ключа,
+    например ('feed_entry__pub_date', 'feed_entry__post_id').
+    """
+
+    def __init__(self, object_list, per_page, key_field='pub_date',
+                 descending=True, lookups=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.key_field = key_field
+        self.descending = descending
+        self.key_lookup, self.pk_lookup = lookups or (key_field, 'pk')
+
+    def encode_cursor(self, obj):
+        value = f'{getattr(obj, self.key_field).isoformat()}|{obj.pk}'
+        return urlsafe_base64_encode(force_bytes(value))
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            key, pk = force_str(urlsafe_base64_decode(cursor)).split('|')
+            return datetime.fromisoformat(key), int(pk)
+        except (ValueError, UnicodeDecodeError):
+            raise InvalidCursor(cursor)
+
+    def page_queryset(self, after=None, before=None):
+        """Запрос строк страницы и одной лишней — признака продолжения"""
+        cursor = before or after
+        scan_descending = self.descending != bool(before)
+        if scan_descending:
+            ordering = (f'-{self.key_lookup}', f'-{self.pk_lookup}')
+        else:
+            ordering = (self.key_lookup, self.pk_lookup)
+        queryset = self.object_list.order_by(*ordering)
+        if cursor:
+            key, pk = self.decode_cursor(cursor)
+            lookup = 'lt' if scan_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.key_lookup}__{lookup}': key})
+                | Q(**{self.key_lookup: key,
+                       f'{self.pk_lookup}__{lookup}': pk}))
+        return queryset[:self.per_page + 1]
+
+    def page(self, after=None, before=None):
+        objects = list(self.page_queryset(after=after, before=before))
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if before:
+            objects.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(after)
+        return CursorPage(
+            objects,
+            self,
+            next_cursor=(self.encode_cursor(objects[-1])
+                         if has_next and objects else None),
+            previous_cursor=(self.encode_cursor(objects[0])
+                             if has_previous and objects else None),
+        )
@@ -0,0 +1,31 @@
+"""Текст публикации, подготовленный для шаблонов.
+
+Отрывок для карточки и HTML текста для страницы публикации вычисляются
+при сохранении (сигнал pre_save) и хранятся в Post.excerpt и
+Post.text_html, поэтому время отрисовки страниц не зависит от длины
+текста. HTML строится из экранированного текста, и шаблоны выводят его
+без повторного экранирования.
+"""
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+
+EXCERPT_MAX_LENGTH = 255
+
+
+def make_excerpt(text):
+    """Первые EXCERPT_WORDS слов, как фильтр truncatewords"""
+    return Truncator(
+        Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    ).chars(EXCERPT_MAX_LENGTH)
+
+
+def render_text(text):
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def render_post(post):
+    """Заполняет отрывок и HTML текста публикации по её тексту"""
+    post.excerpt = make_excerpt(post.text)
+    post.text_html = render_text(post.text)
@@ -0,0 +1,79 @@
+"""Чтение с реплик базы данных.
+
+Реплики перечислены в настройке BLOG_DB_REPLICAS. Запись, а также
+чтение вне представлений с подсказкой read_from_replica идут в основную
+базу; на реплики уходят только GET-запросы таких представлений (их
+включает ReplicaRoutingMiddleware). Модели сессий и пользователей всегда
+читаются из основной базы, иначе вход на сайт был бы виден не сразу.
+"""
+import random
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+PRIMARY_DB = 'default'
+
+PRIMARY_APPS = frozenset({'auth', 'sessions'})
+
+_replica_reads = ContextVar('blog_replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Разрешает чтение с реплик внутри блока"""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def enable_replica_reads():
+    """Разрешает чтение с реплик до выхода из текущего replica_reads()"""
+    _replica_reads.set(True)
+
+
+class ReplicaRouter:
+    """Чтение со случайной реплики, запись в основную базу.
+
+    Схема попадает на реплики вместе с копией базы, поэтому миграции
+    применяются только к основной.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.BLOG_DB_REPLICAS
+        if (not replicas or not _replica_reads.get()
+                or model._meta.app_label in PRIMARY_APPS):
+            return PRIMARY_DB
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY_DB
+
+
+def copy_sqlite_database(target, using=PRIMARY_DB):
+    """Копирует SQLite-базу using в файл target через backup API.
+
+    Копирование идёт постранично и не блокирует запись в основную базу
+    надолго; читатели реплики видят либо старую, либо новую копию.
+    """
+    source = connections[using]
+    if source.vendor != 'sqlite':
+        raise ValueError(
+            'Копировать в реплику можно только базу SQLite, реплики '
+            'других СУБД настраиваются их средствами.')
+    source.ensure_connection()
+    replica = sqlite3.connect(target)
+    try:
+        source.connection.backup(replica)
+    finally:
+        replica.close()
@@ -0,0 +1,80 @@
+"""Планировщик отложенных публикаций.
+
+Страницы лент хранятся в кэше до сброса версии ленты, поэтому выход
+отложенной публикации в срок должен этот сброс вызвать. Состояние
+планировщика в кэше страниц — горизонт (момент последней проверки) и
+pub_date ближайшей отложенной публикации. Когда срок наступает,
+publish_due() сдвигает горизонт и сбрасывает ленты вышедших постов; её
+вызывают команда publish_scheduled, сигналы сохранения публикаций и
+представления лент — через get_publication_horizon(), один раз за
+запрос (PublicationHorizonMixin).
+
+Состояние и страницы должны лежать в кэше, общем для всех процессов
+сайта (BLOG_PAGE_CACHE_BACKEND, см. blog.checks): иначе процесс узнаёт
+о чужих изменениях только по истечении BLOG_PUBLICATION_STATE_TTL и
+BLOG_PAGE_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.db import router
+from django.utils import timezone
+
+from .cache import invalidate_feed_counts, invalidate_feeds, page_cache
+
+PUBLICATION_STATE_KEY = 'blog:publication-state'
+
+
+def get_publication_state():
+    return page_cache().get(PUBLICATION_STATE_KEY)
+
+
+def get_publication_horizon():
+    """Граница pub_date видимых публикаций для текущего запроса.
+
+    Сначала, если наступил срок ближайшей отложенной публикации или
+    прошло BLOG_PUBLICATION_STATE_TTL секунд с последней проверки,
+    вызывается publish_due(). Граница — текущее время, но не раньше
+    горизонта: публикация, сохранённая после проверки, видна сразу.
+    Вызывается из представлений до чтения версий лент; у запросов к
+    базе побочных эффектов нет.
+    """
+    state = get_publication_state()
+    now = timezone.now()
+    if (state is None
+            or state['next_due'] is not None and state['next_due'] <= now
+            or (now - state['checked_at']).total_seconds()
+            > settings.BLOG_PUBLICATION_STATE_TTL):
+        state = publish_due(now)
+    return max(state['horizon'], now)
+
+
+def publish_due(now=None):
+    """Сдвигает горизонт к now и сбрасывает кэш лент с вышедшими постами.
+
+    Публикации читаются из основной базы, даже если запрос
+    обслуживается с реплики. Возвращает новое состояние: horizon,
+    next_due — pub_date ближайшей отложенной публикации (или None) и
+    checked_at.
+    """
+    from .models import Post
+    from .signals import posts_feeds
+
+    now = now or timezone.now()
+    previous = get_publication_state()
+    published = Post.objects.using(router.db_for_write(Post)).filter(
+        is_published=True)
+    state = {
+        'horizon': now,
+        'next_due': (published.filter(pub_date__gt=now)
+                     .order_by('pub_date')
+                     .values_list('pub_date', flat=True).first()),
+        'checked_at': timezone.now(),
+    }
+    page_cache().set(PUBLICATION_STATE_KEY, state, None)
+    if previous is not None and previous['horizon'] < now:
+        released = published.filter(
+            pub_date__gt=previous['horizon'], pub_date__lte=now)
+        if released.exists():
+            feeds = posts_feeds(released)
+            invalidate_feeds(feeds)
+            invalidate_feed_counts(feeds)
+    return state
@@ -0,0 +1,182 @@
+"""Полнотекстовый поиск по публикациям.
+
+Индекс — виртуальная таблица SQLite FTS5 blog_post_search с копией
+заголовка и текста каждой публикации; rowid строки равен id публикации.
+Строки обновляют сигналы сохранения и удаления публикаций, команда
+rebuild_search_index пересобирает индекс целиком. Видимость результатов
+не хранится в индексе: поиск соединяет его с
+PublishedPostQuerySet.published_filter(), поэтому снятие поста или
+категории с публикации не требует переиндексации.
+
+Токенизатор unicode61 не отождествляет «ё» и «е», поэтому в индекс и в
+запрос попадает текст с «ё», заменённой на «е». Заголовок и фрагмент
+с выделенными словами выводятся с исходными буквами (restore_original()).
+"""
+import re
+
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+SEARCH_TABLE = 'blog_post_search'
+
+BATCH_SIZE = 1000
+
+MAX_TERMS = 8
+
+TITLE_WEIGHT = 10.0
+
+SNIPPET_TOKENS = 24
+
+MARK_START, MARK_END = '\x02', '\x03'
+
+TERM_RE = re.compile(r'\w+')
+
+
+def normalize(text):
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def _write_connection():
+    connection = connections[router.db_for_write(Post)]
+    return connection if connection.vendor == 'sqlite' else None
+
+
+def index_rows(rows, connection=None):
+    """Записывает в индекс строки (id, title, text), заменяя прежние"""
+    connection = connection or _write_connection()
+    if connection is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE}(rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [(pk, normalize(title), normalize(text))
+             for pk, title, text in rows])
+
+
+def index_post(post):
+    index_rows([(post.pk, post.title, post.text)])
+
+
+def unindex_post(post_id):
+    connection = _write_connection()
+    if connection is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post_id])
+
+
+def rebuild_search_index(batch_size=BATCH_SIZE, connection=None):
+    """Пересобирает индекс, читая публикации порциями по первичному ключу.
+
+    Индекс очищается и заполняется в одной транзакции: до её фиксации
+    поиск работает по прежнему индексу. Возвращает число публикаций.
+    """
+    connection = connection or _write_connection()
+    if connection is None or connection.vendor != 'sqlite':
+        raise ValueError(
+            'Поисковый индекс FTS5 есть только у базы SQLite, в других '
+            'СУБД поиск идёт без индекса.')
+    posts = Post.objects.using(connection.alias)
+    last_pk = 0
+    total = 0
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        while True:
+            rows = list(posts.filter(pk__gt=last_pk)
+                        .order_by('pk')
+                        .values_list('pk', 'title', 'text')[:batch_size])
+            if not rows:
+                break
+            index_rows(rows, connection)
+            last_pk = rows[-1][0]
+            total += len(rows)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) "
+                "VALUES ('optimize')")
+    return total
+
+
+def search_terms(query):
+    """Слова запроса без операторов FTS5: не больше MAX_TERMS"""
+    return TERM_RE.findall(normalize(query).lower())[:MAX_TERMS]
+
+
+def match_expression(terms):
+    """Все слова запроса как префиксы: «лес» находит и «лесу»"""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_posts(queryset, query):
+    """Публикации queryset, найденные по запросу query, лучшие первыми.
+
+    К публикациям добавляются search_title и search_snippet — заголовок
+    и фрагмент текста с найденными словами между MARK_START и MARK_END
+    (см. highlight()). Для СУБД, отличных от SQLite, поиск идёт по
+    вхождению всех слов без ранжирования и фрагментов.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    if connections[queryset.db].vendor != 'sqlite':
+        for term in terms:
+            queryset = queryset.filter(
+                Q(title__icontains=term) | Q(text__icontains=term))
+        return queryset.order_by('-pub_date')
+    rank = f'bm25({SEARCH_TABLE}, {TITLE_WEIGHT}, 1.0)'
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[f'{SEARCH_TABLE}.rowid = blog_post.id',
+               f'{SEARCH_TABLE} MATCH %s'],
+        params=[match_expression(terms)],
+        select={
+            'search_rank': rank,
+            'search_title': (
+                f"highlight({SEARCH_TABLE}, 0, %s, %s)"),
+            'search_snippet': (
+                f"snippet({SEARCH_TABLE}, 1, %s, %s, '…', "
+                f'{SNIPPET_TOKENS})'),
+        },
+        select_params=[MARK_START, MARK_END, MARK_START, MARK_END],
+    ).order_by('search_rank', '-pub_date')
+
+
+def restore_original(marked, original):
+    """Результат highlight() или snippet() с исходными символами original.
+
+    В индексе лежит normalize(original) той же длины, поэтому найденный
+    в нём фрагмент переносится на original посимвольно. Многоточия по
+    краям фрагмента и отметки MARK_START и MARK_END сохраняются. Если
+    фрагмент не найден (индекс устарел), marked возвращается как есть.
+    """
+    normalized = normalize(original)
+    plain = marked.replace(MARK_START, '').replace(MARK_END, '')
+    for head, tail in (('', ''), ('…', ''), ('', '…'), ('…', '…')):
+        if not (plain.startswith(head) and plain.endswith(tail)):
+            continue
+        core = plain[len(head):len(plain) - len(tail)]
+        position = normalized.find(core)
+        if position < 0:
+            continue
+        chars = []
+        for char in marked[len(head):len(marked) - len(tail)]:
+            if char in (MARK_START, MARK_END):
+                chars.append(char)
+            else:
+                chars.append(original[position])
+                position += 1
+        return head + ''.join(chars) + tail
+    return marked
+
+
+def highlight(text):
+    """Экранирует текст и выделяет найденные слова тегом <mark>"""
+    return mark_safe(escape(text).replace(MARK_START, '<mark>')
+                     .replace(MARK_END, '</mark>'))
@@ -0,0 +1,321 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (
+    INDEX_FEED, category_cache, category_feed, invalidate_feed_counts,
+    invalidate_feeds, invalidate_post_cards, invalidate_profiles,
+    profile_feed
+)
+from .feed import change_comment_count, sync_feed, sync_post
+from .image_queue import enqueue_renditions
+from .images import delete_renditions
+from .models import Category, Comment, Location, Post
+from .rendering import render_post
+from .scheduler import publish_due
+from .search import index_post, unindex_post
+
+User = get_user_model()
+
+PROFILE_HEADER_FIELDS = ('username', 'first_name', 'last_name', 'is_staff')
+
+# Публикации, которые сейчас удаляет Collector: (база, первичный ключ)
+_deleting_posts = ContextVar('blog_deleting_posts', default=frozenset())
+
+
+def posts_feeds(posts):
+    """Ленты, на страницах которых выводятся данные публикаций"""
+    feeds = {INDEX_FEED}
+    rows = (posts.order_by()
+            .values_list('category__slug', 'author__username')
+            .distinct())
+    for slug, username in rows:
+        if slug:
+            feeds.add(category_feed(slug))
+        feeds.add(profile_feed(username))
+    return feeds
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличивает счётчик комментариев публикации.
+
+    Комментарии выводятся на странице публикации, поэтому их создание,
+    изменение и удаление сдвигают её отметку updated_at: по ней
+    строится Last-Modified этой страницы.
+    """
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated_at=timezone.now())
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver(post_save, sender=Comment)
+def touch_commented_post(sender, instance, created, raw=False, **kwargs):
+    """Изменённый комментарий меняет и страницу публикации"""
+    if not created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now())
+
+
+def is_post_deleting(post_id, using):
+    """Удаляет ли Collector публикацию в текущей транзакции"""
+    return ((using, post_id) in _deleting_posts.get()
+            and connections[using].in_atomic_block)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleting_post(sender, instance, using, **kwargs):
+    """Комментарии удаляемой публикации не трогают её счётчик и ленты.
+
+    Collector отправляет pre_delete публикаций до post_delete их
+    комментариев, а ленты публикации сбрасывает invalidate_deleted_feeds.
+    """
+    _deleting_posts.set(_deleting_posts.get() | {(using, instance.pk)})
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, using, **kwargs):
+    _deleting_posts.set(_deleting_posts.get() - {(using, instance.pk)})
+
+
+@receiver(request_started)
+def reset_deleting_posts(sender, **kwargs):
+    """Отметки удалений, прерванных исключением, не переживают запрос"""
+    _deleting_posts.set(frozenset())
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, using, **kwargs):
+    """Уменьшает счётчик комментариев публикации.
+
+    Срабатывает и для удаления через QuerySet.delete() и админку:
+    сигнал отправляется внутри транзакции удаления.
+    """
+    if is_post_deleting(instance.post_id, using):
+        return
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1, updated_at=timezone.now())
+    change_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_feeds(sender, instance, using, raw=False, **kwargs):
+    if not raw and not is_post_deleting(instance.post_id, using):
+        invalidate_feeds(
+            posts_feeds(Post.objects.filter(pk=instance.post_id)))
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Location)
+def remember_old_feeds(sender, instance, raw=False, **kwargs):
+    """Запоминает ленты, где объект выводился до изменения"""
+    if raw or instance.pk is None:
+        instance._old_feeds = set()
+    else:
+        instance._old_feeds = related_feeds(sender, instance)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def invalidate_saved_feeds(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    feeds = (getattr(instance, '_old_feeds', set())
+             | related_feeds(sender, instance))
+    invalidate_feeds(feeds)
+    if sender is not Location:
+        invalidate_feed_counts(feeds)
+
+
+@receiver(post_save, sender=Post)
+def sync_post_feed(sender, instance, raw=False, **kwargs):
+    """Добавляет, обновляет или убирает строку ленты публикации.
+
+    При удалении публикации или категории строки удаляются каскадно.
+    """
+    if not raw:
+        sync_post(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+def sync_category_feed(sender, instance, raw=False, **kwargs):
+    """Снятие категории с публикации убирает из ленты все её посты"""
+    if not raw:
+        sync_feed(instance.category_posts.all())
+
+
+@receiver(pre_save, sender=Post)
+def render_post_text(sender, instance, update_fields=None, **kwargs):
+    """Обновляет отрывок и HTML текста публикации.
+
+    Срабатывает и при загрузке фикстур: поля зависят только от текста.
+    Сохранение с update_fields, включающим text, должно перечислять и
+    excerpt с text_html.
+    """
+    if update_fields is None or 'text' in update_fields:
+        render_post(instance)
+
+
+@receiver(pre_save, sender=Post)
+def fill_loaded_updated_at(sender, instance, raw=False, **kwargs):
+    """Отметка изменения для фикстур, снятых до появления updated_at.
+
+    При загрузке фикстуры auto_now не срабатывает, а пустое поле
+    нарушило бы NOT NULL.
+    """
+    if raw and instance.updated_at is None:
+        instance.updated_at = timezone.now()
+
+
+@receiver(pre_save, sender=Post)
+def check_image_upload(sender, instance, raw=False, **kwargs):
+    """Отмечает новую загрузку и стирает копии прежнего изображения.
+
+    Незакоммиченный FieldFile — файл, загруженный в этом сохранении:
+    имя в хранилище он получит только при записи модели. До обработки
+    новой загрузки шаблоны выводят оригинал.
+    """
+    instance._image_uploaded = (
+        not raw and bool(instance.image) and not instance.image._committed)
+    if raw or not instance.image_renditions:
+        return
+    if instance._image_uploaded or not instance.image:
+        delete_renditions(instance.image.storage, instance.image_renditions)
+        instance.image_renditions = {}
+
+
+@receiver(post_save, sender=Post)
+def queue_image_renditions(sender, instance, created, raw=False, **kwargs):
+    if getattr(instance, '_image_uploaded', False):
+        enqueue_renditions(instance, created)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, raw=False, update_fields=None,
+                     **kwargs):
+    """Обновляет строку поискового индекса публикации"""
+    if raw or update_fields is not None and not (
+            {'title', 'text'} & set(update_fields)):
+        return
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reschedule_publications(sender, instance, raw=False, **kwargs):
+    """Сдвигает горизонт публикаций и срок ближайшей отложенной"""
+    if not raw:
+        publish_due()
+
+
+@receiver(pre_delete, sender=Post)
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Location)
+def invalidate_deleted_feeds(sender, instance, **kwargs):
+    feeds = related_feeds(sender, instance)
+    invalidate_feeds(feeds)
+    if sender is not Location:
+        invalidate_feed_counts(feeds)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_cache(sender, raw=False, **kwargs):
+    """Сбрасывает кэш категорий процесса целиком.
+
+    Категории меняются редко, а при смене slug старый ключ иначе
+    пришлось бы запоминать до сохранения.
+    """
+    if not raw:
+        category_cache.clear()
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def invalidate_cards(sender, raw=False, **kwargs):
+    """Карточки публикаций выводят название категории и места"""
+    if not raw:
+        invalidate_post_cards()
+
+
+def related_feeds(sender, instance):
+    if sender is Post:
+        return posts_feeds(Post.objects.filter(pk=instance.pk))
+    if sender is Category:
+        old_slug = (Category.objects.filter(pk=instance.pk)
+                    .values_list('slug', flat=True).first())
+        feeds = posts_feeds(instance.category_posts.all())
+        feeds.add(category_feed(instance.slug))
+        if old_slug:
+            feeds.add(category_feed(old_slug))
+        return feeds
+    return posts_feeds(Post.objects.filter(location=instance))
+
+
+@receiver(pre_save, sender=User)
+def remember_profile_header(sender, instance, raw=False, **kwargs):
+    instance._old_profile_header = None
+    if not raw and instance.pk is not None:
+        instance._old_profile_header = (
+            User.objects.filter(pk=instance.pk)
+            .values(*PROFILE_HEADER_FIELDS).first())
+
+
+@receiver(post_save, sender=User)
+def invalidate_profile_feeds(sender, instance, raw=False, **kwargs):
+    """Сбрасывает страницы при изменении данных шапки профиля.
+
+    Смена имени пользователя меняет и подписи на карточках публикаций,
+    поэтому в этом случае сбрасываются все ленты с его публикациями.
+    """
+    old = getattr(instance, '_old_profile_header', None)
+    if raw or old is None:
+        return
+    if all(old[field] == getattr(instance, field)
+           for field in PROFILE_HEADER_FIELDS):
+        return
+    invalidate_profiles({old['username'], instance.username})
+    feeds = {profile_feed(old['username']), profile_feed(instance.username)}
+    if old['username'] != instance.username:
+        feeds |= posts_feeds(Post.objects.filter(author=instance))
+        invalidate_post_cards()
+    invalidate_feeds(feeds)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_profile(sender, instance, **kwargs):
+    invalidate_profiles({instance.username})
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Настраивает новое соединение с SQLite по BLOG_SQLITE_PRAGMAS.
+
+    PRAGMA выполняются напрямую драйвером: они не попадают в учёт
+    SQL-запросов и бюджеты представлений.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.BLOG_SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
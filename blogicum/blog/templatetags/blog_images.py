@@ -0,0 +1,43 @@
+from django import template
+from django.conf import settings
+
+register = template.Library()
+
+
+def srcset(storage, renditions, key):
+    """Кандидаты srcset по возрастанию ширины, без повторов"""
+    widths = {}
+    for label, rendition in renditions.items():
+        if label != 'original':
+            widths.setdefault(rendition['width'], rendition[key])
+    return ', '.join(f'{storage.url(name)} {width}w'
+                     for width, name in sorted(widths.items()))
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, rendition='card', lazy=True):
+    """Изображение публикации с srcset/sizes, шириной и высотой.
+
+    rendition — копия из BLOG_IMAGE_RENDITIONS для атрибута src, lazy —
+    отложенная загрузка для изображений ниже первого экрана. Пока копий
+    нет, выводится оригинал.
+    """
+    image = post.image
+    renditions = post.image_renditions
+    context = {'post': post, 'lazy': lazy, 'src': image.url,
+               'width': None, 'height': None, 'srcset': '',
+               'webp_srcset': ''}
+    if rendition in renditions:
+        chosen = renditions[rendition]
+        context.update(
+            src=image.storage.url(chosen['name']),
+            width=chosen['width'],
+            height=chosen['height'],
+            srcset=srcset(image.storage, renditions, 'name'),
+            webp_srcset=srcset(image.storage, renditions, 'webp'),
+            sizes=settings.BLOG_IMAGE_SIZES,
+        )
+    elif 'original' in renditions:
+        context.update(width=renditions['original']['width'],
+                       height=renditions['original']['height'])
+    return context
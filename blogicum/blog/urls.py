@@ -8,6 +8,9 @@ urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
     path('posts/<int:id>/', views.PostDetailView.as_view(),
          name='post_detail'),
+    path('posts/<int:id>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
+    path('search/', views.PostSearchView.as_view(), name='search'),
     path('category/<slug:category_slug>/',
          views.CategoryPostsListView.as_view(), name='category_posts'),
     path('posts/create/', views.PostCreateView.as_view(), name='create_post'),
@@ -1,19 +1,72 @@
 from django.db import models
-from django.db.models import Count
+from django.db.models import Count, F
 from django.utils import timezone
 
+FEED_ORDERING = ('feed_entry__pub_date', 'feed_entry__post_id')
+
+FEED_CARD_FIELDS = (
+    'id', 'title', 'excerpt', 'pub_date', 'is_published', 'image',
+    'image_renditions', 'updated_at',
+    'location', 'location__name', 'location__is_published',
+    'category', 'category__title', 'category__slug',
+    'category__is_published',
+    'author', 'author__username',
+)
+
 
 class PublishedPostQuerySet(models.QuerySet):
     """Менеджер публикации"""
 
-    def published_filter(self):
+    def published_filter(self, horizon=None):
+        """Видимые публикации с pub_date не позже horizon.
+
+        По умолчанию horizon — текущее время; представления передают
+        горизонт, вычисленный один раз за запрос
+        (PublicationHorizonMixin). Построение запроса не обращается ни к
+        кэшу, ни к базе.
+        """
         return self.filter(is_published=True,
                            category__is_published=True,
-                           pub_date__lte=timezone.now())
+                           pub_date__lte=horizon or timezone.now())
+
+    def published_count_order(self, live_count=False):
+        """Число комментариев в comment_total и сортировка по дате.
 
-    def published_count_order(self):
-        return (self.annotate(comment_count=Count('comments'))
+        По умолчанию берётся хранимый счётчик Post.comment_count;
+        live_count=True считает комментарии агрегатом (JOIN + GROUP BY).
+        """
+        if live_count:
+            comment_total = Count('comments')
+        else:
+            comment_total = F('comment_count')
+        return (self.annotate(comment_total=comment_total)
                 .order_by('-pub_date'))
 
+    def feed_entries(self, horizon=None, **filters):
+        """Видимые публикации из материализованной ленты FeedEntry.
+
+        Флаги публикации и категории учтены при записи строк ленты,
+        поэтому запрос — один проход по индексу FeedEntry до horizon
+        (как в published_filter()). filters — условия на столбцы ленты
+        (category_id, author_id); число комментариев тоже берётся из
+        ленты.
+        """
+        lookups = {f'feed_entry__{name}': value
+                   for name, value in filters.items()}
+        lookups['feed_entry__pub_date__lte'] = horizon or timezone.now()
+        return (self.filter(**lookups)
+                .annotate(comment_total=F('feed_entry__comment_count'))
+                .order_by(*(f'-{field}' for field in FEED_ORDERING)))
+
     def post_select_related(self):
         return self.select_related('location', 'author', 'category')
+
+    def feed_projection(self):
+        """Связанные записи и только те столбцы, что выводит карточка.
+
+        Вместо текста публикации выбирается отрывок, у автора — только
+        имя пользователя. Обращение шаблона к другому полю загрузит его
+        отдельным запросом на каждую карточку; при изменении карточки
+        дополните FEED_CARD_FIELDS.
+        """
+        return self.post_select_related().only(*FEED_CARD_FIELDS)
@@ -1,41 +1,67 @@
-from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.views.generic import (
     CreateView, DeleteView, DetailView, ListView, UpdateView
 )
 
+from .cache import (INDEX_FEED, category_feed, get_post_card_version,
+                    get_profile, get_published_category, profile_feed)
 from .forms import CommentForm, PostForm, ProfileEditForm
-from .mixins import (CommentBaseViewMixin, CommentMixin, CheckAuthorMixin,
-                     ProfileGetSuccessUrlMixin, PostDetailGetSuccessUrlMixin,
-                     PostMixin)
-from .models import Category, Post
-
-User = get_user_model()
+from .mixins import (AnonymousPageCacheMixin, CommentBaseViewMixin,
+                     CommentMixin, CheckAuthorMixin, ConditionalGetMixin,
+                     FeedConditionalGetMixin, PaginationModeMixin,
+                     PostCardCacheMixin, ProfileGetSuccessUrlMixin,
+                     PostDetailGetSuccessUrlMixin, PostMixin,
+                     PublicationHorizonMixin)
+from .models import Post
+from .pagination import CursorPaginator, InvalidCursor
+from .search import highlight, restore_original, search_posts
+from .utils import FEED_CARD_FIELDS, FEED_ORDERING
 
 NUMBER_OF_PUBLICATIONS_PER_PAGE = 10
+NUMBER_OF_COMMENTS_PER_PAGE = 20
 
 
-class PostListView(ListView):
+class PostListView(FeedConditionalGetMixin, AnonymousPageCacheMixin,
+                   PaginationModeMixin, PostCardCacheMixin, ListView):
     """Представление для списка публикаций"""
 
     model = Post
     template_name = 'blog/index.html'
     paginate_by = NUMBER_OF_PUBLICATIONS_PER_PAGE
+    query_budget = 8
+    read_from_replica = True
+    feed = INDEX_FEED
+    count_estimate = 'feed_pub_date_idx'
+    cursor_lookups = FEED_ORDERING
 
     def get_queryset(self):
-        return (
-            self.model.objects.post_select_related()
-            .published_filter()
-            .published_count_order())
+        return self.model.objects.feed_projection().feed_entries(
+            self.get_publication_horizon())
 
 
-class PostDetailView(LoginRequiredMixin, DetailView):
+class PostDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     """Представление публикации"""
 
     model = Post
     template_name = 'blog/detail.html'
+    query_budget = 7
+    read_from_replica = True
+    csrf_in_etag = True
+
+    def get_validators(self):
+        """Версия страницы — отметка изменения публикации"""
+        state = (self.model.objects.filter(pk=self.kwargs['id'])
+                 .values('is_published', 'author_id', 'updated_at')
+                 .first())
+        if state is None or not (
+                state['is_published']
+                or state['author_id'] == self.request.user.pk):
+            return None
+        return ((state['updated_at'], get_post_card_version()),
+                state['updated_at'])
 
     def get_object(self, queryset=None):
         post = get_object_or_404(
@@ -49,33 +75,91 @@ class PostDetailView(LoginRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        paginator = CursorPaginator(
+            self.object.comments.select_related('author'),
+            NUMBER_OF_COMMENTS_PER_PAGE,
+            key_field='created_at',
+            descending=False)
+        try:
+            context['comments'] = paginator.page(
+                after=self.request.GET.get('after'))
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
         return context
 
 
-class CategoryPostsListView(ListView):
+class PostCommentsView(PostDetailView):
+    """Фрагмент страницы публикации со следующей порцией комментариев"""
+
+    template_name = 'includes/comment_list.html'
+    query_budget = 7
+
+
+class CategoryPostsListView(FeedConditionalGetMixin, AnonymousPageCacheMixin,
+                            PaginationModeMixin, PostCardCacheMixin, ListView):
     """Представление категории публикаций"""
 
     model = Post
     paginate_by = NUMBER_OF_PUBLICATIONS_PER_PAGE
     template_name = 'blog/category.html'
+    query_budget = 10
+    read_from_replica = True
+
+    cursor_lookups = FEED_ORDERING
+
+    def get_feed(self):
+        return category_feed(self.kwargs['category_slug'])
+
+    category = None
+
+    def get_category(self):
+        if self.category is None:
+            self.category = get_published_category(
+                self.kwargs['category_slug'])
+            if self.category is None:
+                raise Http404('Category not found')
+        return self.category
 
     def get_queryset(self):
-        category = get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True)
+        return self.model.objects.feed_projection().feed_entries(
+            self.get_publication_horizon(),
+            category_id=self.get_category().id)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['category'] = self.get_category()
+        return context
+
 
-        return (
-            category.category_posts.post_select_related()
-            .published_filter()
-            .published_count_order())
+class PostSearchView(PublicationHorizonMixin, ListView):
+    """Поиск по заголовкам и текстам опубликованных публикаций"""
+
+    model = Post
+    template_name = 'blog/search.html'
+    paginate_by = NUMBER_OF_PUBLICATIONS_PER_PAGE
+    query_budget = 6
+    read_from_replica = True
+
+    def get_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_queryset(self):
+        return search_posts(
+            self.model.objects.post_select_related()
+            .only(*FEED_CARD_FIELDS, 'text')
+            .published_filter(self.get_publication_horizon()),
+            self.get_query())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category.objects.values('id', 'title', 'description'),
-            slug=self.kwargs['category_slug'])
+        context['query'] = self.get_query()
+        for post in context['page_obj']:
+            post.title_html = highlight(restore_original(
+                getattr(post, 'search_title', post.title), post.title))
+            snippet = getattr(post, 'search_snippet', None)
+            post.snippet_html = highlight(
+                restore_original(snippet, post.text) if snippet
+                else post.excerpt)
         return context
 
 
@@ -84,6 +168,7 @@ class PostCreateView(PostMixin, ProfileGetSuccessUrlMixin, LoginRequiredMixin,
     """Представление для создания новой публикации"""
 
     form_class = PostForm
+    query_budget = 16
 
     def form_valid(self, form):
         form.instance.author = self.request.user
@@ -96,6 +181,7 @@ class PostUpdateView(PostDetailGetSuccessUrlMixin, PostMixin, CheckAuthorMixin,
 
     form_class = PostForm
     pk_url_kwarg = 'post_id'
+    query_budget = 18
 
 
 class PostDeleteView(PostMixin, CheckAuthorMixin, ProfileGetSuccessUrlMixin,
@@ -103,6 +189,7 @@ class PostDeleteView(PostMixin, CheckAuthorMixin, ProfileGetSuccessUrlMixin,
     """Представление для удаления публикации"""
 
     pk_url_kwarg = 'post_id'
+    query_budget = 12
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -110,24 +197,48 @@ class PostDeleteView(PostMixin, CheckAuthorMixin, ProfileGetSuccessUrlMixin,
         return context
 
 
-class ProfileListView(ListView):
+class ProfileListView(FeedConditionalGetMixin, AnonymousPageCacheMixin,
+                      PaginationModeMixin, PostCardCacheMixin, ListView):
     """Представление списка публикаций пользователя"""
 
     model = Post
     template_name = 'blog/profile.html'
     paginate_by = NUMBER_OF_PUBLICATIONS_PER_PAGE
+    query_budget = 9
+    read_from_replica = True
+
+    def get_feed(self):
+        """Автор видит и скрытые публикации: его страница не кэшируется"""
+        if self.is_own_profile():
+            return None
+        return profile_feed(self.kwargs['username'])
+
+    def get_cursor_lookups(self):
+        return None if self.is_own_profile() else FEED_ORDERING
+
+    profile = None
+
+    def get_profile(self):
+        if self.profile is None:
+            self.profile = get_profile(self.kwargs['username'])
+            if self.profile is None:
+                raise Http404('User not found')
+        return self.profile
+
+    def is_own_profile(self):
+        return self.request.user.pk == self.get_profile().id
 
     def get_queryset(self):
-        return (
-            self.model.objects.post_select_related()
-            .filter(author__username=self.kwargs['username'])
-            .published_count_order())
+        posts = self.model.objects.feed_projection()
+        if not self.is_own_profile():
+            return posts.feed_entries(self.get_publication_horizon(),
+                                      author_id=self.get_profile().id)
+        return (posts.filter(author_id=self.get_profile().id)
+                .published_count_order())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User,
-            username=self.kwargs['username'])
+        context['profile'] = self.get_profile()
         return context
 
 
@@ -137,6 +248,7 @@ class ProfileUpdateView(ProfileGetSuccessUrlMixin, LoginRequiredMixin,
 
     template_name = 'blog/user.html'
     form_class = ProfileEditForm
+    query_budget = 8
 
     def get_object(self, queryset=None):
         return self.request.user
@@ -147,11 +259,13 @@ class CommentCreateView(PostDetailGetSuccessUrlMixin, CommentMixin,
     """Представление для создания комментария"""
 
     post_obj = None
+    query_budget = 12
 
     def dispatch(self, request, *args, **kwargs):
         self.post_obj = get_object_or_404(Post, id=kwargs['post_id'])
         return super().dispatch(request, *args, **kwargs)
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = self.post_obj
@@ -161,10 +275,14 @@ class CommentCreateView(PostDetailGetSuccessUrlMixin, CommentMixin,
 class CommentUpdateView(CommentBaseViewMixin, UpdateView):
     """Представление для редактировани комментария"""
 
-    pass
+    query_budget = 10
 
 
 class CommentDeleteView(CommentBaseViewMixin, DeleteView):
     """Представление для удаления комментария"""
 
-    pass
+    query_budget = 14
+
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
@@ -43,11 +43,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'debug_toolbar.middleware.DebugToolbarMiddleware',
@@ -82,9 +84,43 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# PRAGMA для каждого нового соединения с SQLite (blog.signals), в порядке
+# перечисления. В режиме WAL чтение не ждёт записи, а synchronous=NORMAL
+# безопасен для целостности базы; busy_timeout (мс) задаётся первым, чтобы
+# переключение журнала ждало блокировку, а не падало с database is locked.
+# cache_size в отрицательных значениях — KiB.
+
+BLOG_SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+}
+
+# Реплики для чтения лент и страниц публикаций (blog.routers). Пустой
+# список — всё читается из default. Локально: BLOG_DB_REPLICAS =
+# ['replica'] и команда sync_replicas, копирующая db.sqlite3 в реплику.
+
+BLOG_DB_REPLICAS = []
+
+# После изменяющего запроса пользователь читает основную базу, пока жива
+# cookie BLOG_PRIMARY_COOKIE, с
+
+BLOG_PRIMARY_COOKIE = 'blog_primary'
+
+BLOG_READ_YOUR_WRITES_SECONDS = 10
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -135,6 +171,8 @@ INTERNAL_IPS = [
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
 LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
@@ -144,3 +182,148 @@ CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Постраничная навигация лент: 'offset' (?page=) или 'cursor' (?after=/?before=)
+
+BLOG_PAGINATION_MODE = 'offset'
+
+# Кэш страниц лент для анонимных посетителей.
+# BLOG_PAGE_CACHE_BACKEND: 'locmem', 'filesystem' или 'redis'
+# (для 'redis' нужен пакет django-redis). В нём же версии лент и
+# состояние планировщика, поэтому на сайте из нескольких процессов кэш
+# должен быть общим: 'locmem' годится только для разработки (blog.W001).
+
+BLOG_PAGE_CACHE_BACKEND = 'locmem'
+
+BLOG_PAGE_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum-pages',
+    },
+    'filesystem': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'page_cache',
+    },
+    'redis': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    },
+}
+
+BLOG_PAGE_CACHE_ALIAS = 'pages'
+
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Число публикаций в лентах для постраничной навигации: хранится в кэше
+# страниц; для лент крупнее порога берётся оценка по статистике ANALYZE.
+# Статистику обновляет команда rebuild_feed; если лента с тех пор
+# заметно изменилась, оценку поправляет точный подсчёт на крайних
+# страницах.
+
+BLOG_FEED_COUNT_TIMEOUT = 60 * 5
+
+BLOG_FEED_COUNT_ESTIMATE_THRESHOLD = 100_000
+
+# Как часто перепроверяется срок ближайшей отложенной публикации
+# (blog.scheduler), если он ещё не наступил, с
+
+BLOG_PUBLICATION_STATE_TTL = 60
+
+# Кэш отрисованных карточек публикаций (фрагменты includes/post_card.html)
+
+BLOG_POST_CARD_CACHE_ALIAS = 'default'
+
+BLOG_POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+# Кэш опубликованных категорий в памяти процесса (LRU с временем жизни)
+
+BLOG_CATEGORY_CACHE_SIZE = 256
+
+BLOG_CATEGORY_CACHE_TTL = 60
+
+# Данные шапки профиля по имени пользователя: в памяти процесса и в общем
+# кэше BLOG_PROFILE_CACHE_ALIAS
+
+BLOG_PROFILE_CACHE_SIZE = 1024
+
+BLOG_PROFILE_CACHE_TTL = 30
+
+BLOG_PROFILE_CACHE_ALIAS = 'default'
+
+BLOG_PROFILE_CACHE_TIMEOUT = 60 * 60
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    BLOG_PAGE_CACHE_ALIAS: BLOG_PAGE_CACHE_BACKENDS[BLOG_PAGE_CACHE_BACKEND],
+}
+
+# Уменьшенные копии Post.image (blog.images): ширина каждой копии в px.
+# Копии лежат рядом с оригиналом: <имя>.<копия>.jpg (.png) и .webp.
+# BLOG_IMAGE_SIZES — атрибут sizes: карточки и страница поста шириной 40rem.
+
+BLOG_IMAGE_RENDITIONS = {
+    'card': 640,
+    'detail': 1280,
+}
+
+BLOG_IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+
+BLOG_IMAGE_QUALITY = 85
+
+BLOG_IMAGE_WEBP_QUALITY = 80
+
+# Очередь создания копий (blog.image_queue, команда process_images):
+# время, после которого задача «выполняется» считается зависшей, с;
+# число попыток; сколько последних задач учитывать в метриках.
+
+BLOG_IMAGE_JOB_TIMEOUT = 60 * 10
+
+BLOG_IMAGE_JOB_ATTEMPTS = 3
+
+BLOG_IMAGE_STATS_WINDOW = 100
+
+# Раздача MEDIA_ROOT (blog.media): время кэширования обычных файлов и
+# неизменяемых копий изображений с хешем в имени, с. BLOG_MEDIA_SENDFILE
+# отдаёт передачу файла веб-серверу: None, 'x-sendfile' или
+# 'x-accel-redirect' (nginx: internal location BLOG_MEDIA_ACCEL_PREFIX,
+# alias на MEDIA_ROOT).
+
+BLOG_MEDIA_MAX_AGE = 60 * 60
+
+BLOG_MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+BLOG_MEDIA_SENDFILE = None
+
+BLOG_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Учёт SQL-запросов на каждый запрос к сайту (blog.middleware).
+# Бюджеты задаются атрибутом query_budget представлений в blog/views.py;
+# уровень INFO журнала blog.sql выводит строку на каждый запрос.
+# Заголовки X-SQL-* раскрывают клиенту время работы базы, поэтому по
+# умолчанию отправляются только при DEBUG.
+
+BLOG_QUERY_STATS_HEADERS = DEBUG
+
+BLOG_QUERY_BUDGET_ENFORCE = False
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'blog.sql': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+        'blog.images': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
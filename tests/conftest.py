@@ -41,6 +41,25 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+
+    from blog.cache import category_cache, profile_cache
+
+    for cache in caches.all():
+        cache.clear()
+    category_cache.clear()
+    profile_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path / "media"
+    yield settings.MEDIA_ROOT
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
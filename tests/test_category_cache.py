@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.cache import category_cache
+
+
+def category_selects(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [q['sql'] for q in queries
+                      if q['sql'].startswith('SELECT "blog_category"')]
+
+
+@pytest.mark.django_db
+def test_category_page_reads_category_from_cache(
+        user_client, post_with_published_location):
+    category = post_with_published_location.category
+    url = f'/category/{category.slug}/'
+    _, selects = category_selects(user_client, url)
+    assert len(selects) == 1, (
+        'Убедитесь, что категория загружается из базы один раз за запрос.'
+    )
+    hits = category_cache.hits
+    response, selects = category_selects(user_client, url)
+    assert not selects, (
+        'Убедитесь, что повторный запрос страницы категории берёт '
+        'категорию из кэша процесса.'
+    )
+    assert category_cache.hits > hits
+    assert response.context['category'].title == category.title
+
+    category.is_published = False
+    category.save()
+    assert user_client.get(url).status_code == 404, (
+        'Убедитесь, что снятие категории с публикации сбрасывает кэш '
+        'категорий.'
+    )
+
+
+def test_local_cache_evicts_least_recently_used():
+    from blog.cache import LocalTTLCache
+
+    cache = LocalTTLCache(maxsize=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'size': 2}
+
+    expired = LocalTTLCache(maxsize=2, ttl=-1)
+    expired.set('a', 1)
+    assert expired.get('a') is None
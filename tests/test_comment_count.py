@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_create_and_delete(
+        mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что при создании комментария увеличивается '
+        '`Post.comment_count`.'
+    )
+
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что при удалении комментария уменьшается '
+        '`Post.comment_count`.'
+    )
+
+    Comment.objects.filter(post=post).delete()
+    post.refresh_from_db()
+    assert post.comment_count == 0, (
+        'Убедитесь, что массовое удаление комментариев обновляет '
+        '`Post.comment_count`.'
+    )
+
+
+@pytest.mark.django_db
+def test_stored_and_live_comment_count_agree(
+        mixer, post_with_published_location):
+    mixer.cycle(2).blend('blog.Comment', post=post_with_published_location)
+    stored = Post.objects.published_count_order().get(
+        pk=post_with_published_location.pk)
+    live = Post.objects.published_count_order(live_count=True).get(
+        pk=post_with_published_location.pk)
+    assert stored.comment_total == live.comment_total == 2
+
+
+@pytest.mark.django_db
+def test_recount_comments_repairs_drift(mixer, post_with_published_location):
+    mixer.cycle(2).blend('blog.Comment', post=post_with_published_location)
+    Post.objects.update(comment_count=100)
+    call_command('recount_comments', chunk_size=1)
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.comment_count == 2, (
+        'Убедитесь, что команда `recount_comments` исправляет '
+        'рассинхронизированный счётчик комментариев.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_delete_queries_do_not_grow_with_comments(
+        user, user_client, django_assert_max_num_queries,
+        post_with_published_location):
+    post = post_with_published_location
+    Comment.objects.bulk_create(
+        Comment(post=post, author=user, text='Текст') for _ in range(50))
+    with django_assert_max_num_queries(12):
+        response = user_client.post(f'/posts/{post.id}/delete/')
+    assert response.status_code == 302
+    assert not Comment.objects.filter(post_id=post.id).exists(), (
+        'Убедитесь, что комментарии удаляются вместе с публикацией и без '
+        'запросов на каждый комментарий.'
+    )
@@ -0,0 +1,32 @@
+import pytest
+
+from blog.views import NUMBER_OF_COMMENTS_PER_PAGE
+
+
+@pytest.mark.django_db
+def test_comments_are_paginated(
+        user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    total = NUMBER_OF_COMMENTS_PER_PAGE * 2 + 1
+    comments = mixer.cycle(total).blend('blog.Comment', post=post)
+
+    page = user_client.get(f'/posts/{post.id}/').context['comments']
+    assert len(page) == NUMBER_OF_COMMENTS_PER_PAGE, (
+        'Убедитесь, что на странице публикации выводится ограниченное '
+        'число комментариев.'
+    )
+    seen = [comment.id for comment in page]
+    while page.has_next():
+        response = user_client.get(
+            f'/posts/{post.id}/comments/?after={page.next_cursor}')
+        assert response.status_code == 200
+        assert '<html' not in response.content.decode('utf-8'), (
+            'Убедитесь, что следующая порция комментариев отдаётся '
+            'фрагментом HTML, без базового шаблона.'
+        )
+        page = response.context['comments']
+        seen.extend(comment.id for comment in page)
+    assert seen == [comment.id for comment in comments], (
+        'Убедитесь, что порции комментариев выводятся по порядку и без '
+        'повторов.'
+    )
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+
+
+def blog_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if 'blog_' in query['sql']]
+
+
+@pytest.mark.django_db
+def test_feed_not_modified(
+        client, user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    for url in ('/', f'/category/{post.category.slug}/',
+                f'/profile/{post.author.username}/'):
+        response = client.get(url)
+        etag = response['ETag']
+        assert 'no-cache' in response['Cache-Control']
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            'Убедитесь, что повторный запрос неизменившейся ленты с '
+            'If-None-Match получает ответ 304.'
+        )
+        assert not blog_queries(context)
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        ).status_code == 304
+        assert user_client.get(
+            url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Убедитесь, что ETag страницы зависит от пользователя.'
+        )
+
+    etag = client.get('/')['ETag']
+    mixer.blend('blog.Comment', post=post)
+    assert client.get('/', HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        'Убедитесь, что изменение ленты меняет ETag её страниц.'
+    )
+
+
+@pytest.mark.django_db
+def test_post_detail_not_modified(
+        user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    etag = user_client.get(url)['ETag']
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        'Убедитесь, что повторный запрос неизменившейся страницы '
+        'публикации с If-None-Match получает ответ 304.'
+    )
+    assert len(blog_queries(context)) == 1, (
+        'Убедитесь, что ответ 304 не выполняет основной запрос страницы.'
+    )
+    assert 'private' in response['Cache-Control']
+
+    comment = mixer.blend('blog.Comment', post=post)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    etag = response['ETag']
+    comment.text = 'Исправленный комментарий'
+    comment.save()
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        'Убедитесь, что изменение комментария меняет ETag страницы '
+        'публикации.'
+    )
+
+    Post.objects.filter(pk=post.pk).update(
+        updated_at=post.updated_at - timedelta(days=1))
+    last_modified = user_client.get(url)['Last-Modified']
+    comment.delete()
+    assert user_client.get(
+        url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 200, (
+        'Убедитесь, что удаление комментария меняет Last-Modified '
+        'страницы публикации.'
+    )
+
+
+@pytest.mark.django_db
+def test_hidden_post_not_validated(
+        another_user_client, post_with_published_location):
+    post = post_with_published_location
+    Post.objects.filter(pk=post.pk).update(is_published=False)
+    response = another_user_client.get(f'/posts/{post.id}/')
+    assert response.status_code == 404
+    assert not response.has_header('ETag')
+
+
+@pytest.mark.django_db
+def test_post_detail_etag_changes_on_login(
+        client, user, post_with_published_location):
+    user.set_password('password')
+    user.save()
+    credentials = {'username': user.username, 'password': 'password'}
+    url = f'/posts/{post_with_published_location.id}/'
+    client.post('/auth/login/', credentials)
+    etag = client.get(url)['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    client.post('/auth/logout/')
+    client.post('/auth/login/', credentials)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что после повторного входа страница с формой '
+        'комментария отрисовывается заново: в ней новый токен CSRF.'
+    )
+    assert response['ETag'] != etag
@@ -0,0 +1,39 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from conftest import N_PER_PAGE
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGINATION_MODE='cursor')
+def test_cursor_pagination_walks_feed(
+        user_client, many_posts_with_published_locations):
+    expected = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id), reverse=True)
+    seen = []
+    response = user_client.get('/')
+    while True:
+        page = response.context['page_obj']
+        assert len(page) <= N_PER_PAGE
+        seen.extend(post.id for post in page)
+        if not page.has_next():
+            break
+        response = user_client.get(f'/?after={page.next_cursor}')
+    assert seen == [post.id for post in expected], (
+        'Убедитесь, что при навигации по курсору все публикации ленты '
+        'выводятся ровно один раз в порядке убывания даты публикации.'
+    )
+
+    previous = user_client.get(f'/?before={page.previous_cursor}')
+    assert [post.id for post in previous.context['page_obj']] == (
+        seen[:N_PER_PAGE])
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGINATION_MODE='cursor')
+def test_cursor_pagination_rejects_broken_cursor(user_client):
+    response = user_client.get('/?after=not-a-cursor')
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,102 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    counts = [q['sql'] for q in queries if 'COUNT(' in q['sql'].upper()]
+    return response, counts
+
+
+@pytest.mark.django_db
+def test_feed_count_is_cached(
+        user_client, mixer, many_posts_with_published_locations):
+    _, counts = count_queries(user_client, '/')
+    assert counts, 'Первый запрос ленты должен посчитать публикации.'
+    response, counts = count_queries(user_client, '/')
+    assert not counts, (
+        'Убедитесь, что число публикаций ленты берётся из кэша, а не '
+        'пересчитывается на каждый запрос.'
+    )
+    assert response.context['paginator'].count == N_PER_PAGE * 2
+
+    post = many_posts_with_published_locations[0]
+    post.is_published = False
+    post.save()
+    response, counts = count_queries(user_client, '/')
+    assert counts, (
+        'Убедитесь, что снятие публикации сбрасывает закэшированное число '
+        'публикаций ленты.'
+    )
+    assert response.context['paginator'].count == N_PER_PAGE * 2 - 1
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='Оценка строится по статистике SQLite')
+@pytest.mark.django_db
+@override_settings(BLOG_FEED_COUNT_ESTIMATE_THRESHOLD=1)
+def test_large_feed_count_is_estimated(
+        user_client, many_posts_with_published_locations):
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    response, counts = count_queries(user_client, '/')
+    assert not counts
+    assert response.context['paginator'].count == N_PER_PAGE * 2
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='Оценка строится по статистике SQLite')
+@pytest.mark.django_db
+@override_settings(BLOG_FEED_COUNT_ESTIMATE_THRESHOLD=1)
+def test_category_and_profile_counts_are_exact(
+        user_client, mixer, many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    mixer.blend('blog.Post', is_published=True, pub_date=post.pub_date,
+                category__is_published=True, location=None)
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    for url in (f'/category/{post.category.slug}/',
+                f'/profile/{post.author.username}/'):
+        response, counts = count_queries(user_client, url)
+        assert counts, (
+            'Убедитесь, что число публикаций категории и профиля не '
+            'подменяется средним по статистике индекса.'
+        )
+        assert response.context['paginator'].count == N_PER_PAGE * 2
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='Оценка строится по статистике SQLite')
+@pytest.mark.django_db
+@override_settings(BLOG_FEED_COUNT_ESTIMATE_THRESHOLD=1)
+def test_stale_estimate_does_not_hide_pages(
+        user_client, mixer, many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+    mixer.cycle(N_PER_PAGE * 2 + 1).blend(
+        'blog.Post', author=post.author, category=post.category,
+        location=post.location, pub_date=post.pub_date)
+    for page in (3, 4):
+        response = user_client.get('/', {'page': page})
+        assert response.status_code == 200, (
+            'Убедитесь, что устаревшая оценка числа публикаций не скрывает '
+            'страницы ленты.'
+        )
+        assert response.context['page_obj'].object_list
+    assert response.context['paginator'].count == N_PER_PAGE * 4 + 1
+    assert user_client.get('/', {'page': 6}).status_code == 404
+
+    Post.objects.exclude(pk=post.pk).delete()
+    response = user_client.get('/')
+    assert response.context['paginator'].num_pages == 1, (
+        'Убедитесь, что завышенная оценка не оставляет в конце ленты '
+        'пустых страниц.'
+    )
+    assert user_client.get('/', {'page': 2}).status_code == 404
@@ -0,0 +1,64 @@
+import pytest
+from django.db import connection
+from django.db.models import Model
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import post_card_cache
+
+
+@pytest.fixture
+def forbid_deferred_loading(monkeypatch):
+    """Загрузка отложенного поля экземпляра проваливает тест"""
+
+    def refresh_from_db(self, using=None, fields=None):
+        raise AssertionError(
+            f'Шаблон обратился к отложенному полю {fields} модели '
+            f'{type(self).__name__}: это отдельный запрос на каждую '
+            'карточку. Добавьте поле в FEED_CARD_FIELDS.'
+        )
+
+    monkeypatch.setattr(Model, 'refresh_from_db', refresh_from_db)
+
+
+@pytest.mark.parametrize('mode', ('offset', 'cursor'))
+@pytest.mark.django_db
+def test_feed_cards_use_only_projected_fields(
+        settings, mode, user_client, another_user_client, mixer, user,
+        post_with_published_location, forbid_deferred_loading):
+    settings.BLOG_PAGINATION_MODE = mode
+    post = post_with_published_location
+    mixer.cycle(12).blend(
+        'blog.Post', author=user, category=post.category, location=None,
+        is_published=True, pub_date=timezone.now(), text='слово ' * 50)
+    mixer.blend('blog.Comment', post=post)
+    pages = (
+        (user_client, '/'),
+        (user_client, f'/category/{post.category.slug}/'),
+        (user_client, f'/profile/{user.username}/'),
+        (another_user_client, f'/profile/{user.username}/'),
+        (user_client, '/search/?q=слово'),
+        (user_client, '/?page=2'),
+    )
+    for client, url in pages:
+        post_card_cache().clear()
+        assert client.get(url).status_code == 200
+
+
+@pytest.mark.django_db
+def test_feed_query_skips_text_and_user_columns(
+        client, post_with_published_location):
+    with CaptureQueriesContext(connection) as context:
+        client.get('/')
+    feed_queries = [query['sql'] for query in context.captured_queries
+                    if 'FROM "blog_post"' in query['sql']
+                    and '"blog_feedentry"' in query['sql']
+                    and 'COUNT(' not in query['sql']]
+    assert feed_queries
+    for sql in feed_queries:
+        for column in ('"blog_post"."text"', '"auth_user"."password"',
+                       '"auth_user"."email"', '"blog_category"."description"'):
+            assert column not in sql, (
+                f'Убедитесь, что запрос ленты не выбирает столбец {column}.'
+            )
+        assert '"blog_post"."excerpt"' in sql
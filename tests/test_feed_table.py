@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import FeedEntry
+
+
+def feed_entry(post):
+    return FeedEntry.objects.filter(post=post).first()
+
+
+@pytest.mark.django_db
+def test_feed_follows_post_and_category(post_with_published_location):
+    post = post_with_published_location
+    entry = feed_entry(post)
+    assert entry is not None, (
+        'Убедитесь, что опубликованная публикация попадает в таблицу '
+        '`FeedEntry`.'
+    )
+    assert (entry.category_id, entry.author_id, entry.pub_date) == (
+        post.category_id, post.author_id, post.pub_date)
+
+    post.is_published = False
+    post.save()
+    assert feed_entry(post) is None, (
+        'Убедитесь, что снятая с публикации запись удаляется из ленты.'
+    )
+
+    post.is_published = True
+    post.save()
+    post.category.is_published = False
+    post.category.save()
+    assert feed_entry(post) is None, (
+        'Убедитесь, что снятие категории с публикации убирает её посты из '
+        'ленты.'
+    )
+    post.category.is_published = True
+    post.category.save()
+    assert feed_entry(post) is not None
+
+
+@pytest.mark.django_db
+def test_feed_comment_count(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(2).blend('blog.Comment', post=post)
+    assert feed_entry(post).comment_count == 2
+    comments[0].delete()
+    assert feed_entry(post).comment_count == 1, (
+        'Убедитесь, что число комментариев в ленте следует за созданием и '
+        'удалением комментариев.'
+    )
+
+
+@pytest.mark.django_db
+def test_rebuild_feed_repairs_table(
+        capsys, post_with_published_location, posts_with_unpublished_category):
+    FeedEntry.objects.all().delete()
+    FeedEntry.objects.create(
+        post=posts_with_unpublished_category[0],
+        category=posts_with_unpublished_category[0].category,
+        author=posts_with_unpublished_category[0].author,
+        pub_date=posts_with_unpublished_category[0].pub_date)
+    call_command('rebuild_feed', batch_size=1)
+    assert list(FeedEntry.objects.values_list('post_id', flat=True)) == [
+        post_with_published_location.id], (
+        'Убедитесь, что команда `rebuild_feed` оставляет в ленте ровно '
+        'видимые публикации.'
+    )
+    assert 'Публикаций в ленте: 1' in capsys.readouterr().out
+
+
+@pytest.mark.django_db
+def test_public_profile_reads_feed(
+        user_client, another_user_client, post_with_published_location,
+        unpublished_posts_with_published_locations):
+    url = f'/profile/{post_with_published_location.author.username}/'
+    own = user_client.get(url).context['page_obj']
+    public = another_user_client.get(url).context['page_obj']
+    assert len(own) == len(unpublished_posts_with_published_locations) + 1
+    assert [post.id for post in public] == [post_with_published_location.id], (
+        'Убедитесь, что посетители чужого профиля видят только '
+        'опубликованные записи.'
+    )
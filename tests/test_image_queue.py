@@ -0,0 +1,79 @@
+import logging
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.image_queue import claim_job, process_pending, queue_stats
+from blog.models import ImageJob, Post
+
+
+@pytest.mark.django_db
+def test_upload_only_queues_job(user_client, post_with_published_location):
+    post = post_with_published_location
+    assert list(ImageJob.objects.values_list('post_id', 'status')) == [
+        (post.id, ImageJob.PENDING)], (
+        'Убедитесь, что сохранение публикации с изображением ставит задачу '
+        'в очередь, а не обрабатывает изображение в запросе.'
+    )
+    assert Post.objects.get(pk=post.pk).image_renditions == {}
+    content = user_client.get('/').content.decode('utf-8')
+    assert f'src="{post.image.url}"' in content, (
+        'Убедитесь, что до обработки карточка выводит оригинал.'
+    )
+    assert 'srcset=' not in content
+
+    post.title = 'Новый заголовок'
+    post.save()
+    assert ImageJob.objects.count() == 1
+
+    process_pending()
+    assert ImageJob.objects.get().status == ImageJob.DONE
+    assert '.webp 100w' in user_client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что после обработки карточка выводит копии.'
+    )
+
+
+@pytest.mark.django_db
+def test_failed_job_retried_then_failed(
+        settings, caplog, post_with_published_location):
+    settings.BLOG_IMAGE_JOB_ATTEMPTS = 2
+    post = post_with_published_location
+    post.image.storage.delete(post.image.name)
+    with caplog.at_level(logging.WARNING, logger='blog.images'):
+        process_pending(limit=1)
+        assert ImageJob.objects.get().status == ImageJob.PENDING
+        process_pending()
+    job = ImageJob.objects.get()
+    assert (job.status, job.attempts) == (ImageJob.FAILED, 2)
+    assert job.error
+    assert caplog.records[-1].image_job['status'] == ImageJob.FAILED
+
+
+@pytest.mark.django_db
+def test_stalled_job_requeued(post_with_published_location):
+    job = claim_job()
+    ImageJob.objects.filter(pk=job.pk).update(
+        started_at=timezone.now() - timedelta(days=1))
+    assert claim_job().pk == job.pk, (
+        'Убедитесь, что зависшая задача возвращается в очередь.'
+    )
+
+
+@pytest.mark.django_db
+def test_queue_metrics(capsys, mixer, post_with_published_location):
+    stats = queue_stats()
+    assert stats['pending'] == 1
+    assert stats['oldest_pending_s'] is not None
+    assert stats['processing_ms_avg'] is None
+
+    call_command('process_images')
+    stats = queue_stats()
+    assert stats['pending'] == 0
+    assert stats['processing_ms_avg'] >= 0
+    assert stats['processing_ms_p95'] >= 0
+    assert 'Обработано задач: 1' in capsys.readouterr().out
+
+    call_command('process_images', stats=True)
+    assert '"pending": 0' in capsys.readouterr().out
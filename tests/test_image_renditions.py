@@ -0,0 +1,100 @@
+import re
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.image_queue import process_pending
+from blog.images import is_rendition_name
+from blog.models import Post
+
+
+@pytest.fixture
+def post_with_large_image(mixer, user, published_location, published_category):
+    img_io = BytesIO()
+    Image.new('RGB', (1600, 1200), color=(73, 109, 137)).save(
+        img_io, format='JPEG')
+    post = mixer.blend(
+        'blog.Post', location=published_location,
+        category=published_category, author=user,
+        image=ImageFile(img_io, name='large_image.jpg'))
+    process_pending()
+    return post
+
+
+@pytest.mark.django_db
+def test_renditions_generated_for_upload(post_with_large_image):
+    renditions = Post.objects.get(
+        pk=post_with_large_image.pk).image_renditions
+    assert renditions['original'] == {
+        'name': post_with_large_image.image.name,
+        'width': 1600, 'height': 1200}
+    for label, size in (('card', (640, 480)), ('detail', (1280, 960))):
+        rendition = renditions[label]
+        assert (rendition['width'], rendition['height']) == size, (
+            'Убедитесь, что при загрузке изображения создаются копии '
+            'нужной ширины.'
+        )
+        assert re.search(rf'\.{label}\.[0-9a-f]{{12}}\.jpg$',
+                         rendition['name'])
+        assert is_rendition_name(rendition['webp'])
+        with default_storage.open(rendition['webp']) as webp:
+            assert Image.open(webp).format == 'WEBP'
+        with default_storage.open(rendition['name']) as jpeg:
+            assert Image.open(jpeg).size == size
+
+
+@pytest.mark.django_db
+def test_small_image_not_upscaled(post_with_published_location):
+    post = post_with_published_location
+    process_pending()
+    card = Post.objects.get(pk=post.pk).image_renditions['card']
+    assert card['name'] == post.image.name
+    assert not is_rendition_name(card['name'])
+    assert (card['width'], card['height']) == (100, 100)
+    assert default_storage.exists(card['webp'])
+
+
+@pytest.mark.django_db
+def test_feed_card_uses_srcset(user_client, post_with_large_image):
+    content = user_client.get('/').content.decode('utf-8')
+    assert 'large_image' in content
+    assert re.search(r'\.card\.[0-9a-f]{12}\.webp 640w', content)
+    assert re.search(r'\.detail\.[0-9a-f]{12}\.webp 1280w', content)
+    assert 'width="640" height="480"' in content, (
+        'Убедитесь, что изображение в карточке выводится с srcset, sizes '
+        'и явными шириной и высотой.'
+    )
+    assert f'href="{post_with_large_image.image.url}"' in content
+
+
+@pytest.mark.django_db
+def test_removed_image_deletes_renditions(post_with_large_image):
+    post = Post.objects.get(pk=post_with_large_image.pk)
+    card = post.image_renditions['card']
+    post.image = None
+    post.save()
+    assert post.image_renditions == {}
+    assert not default_storage.exists(card['name'])
+    assert not default_storage.exists(card['webp'])
+
+
+@pytest.mark.django_db
+def test_backfill_renditions(capsys, post_with_large_image):
+    before = Post.objects.get(pk=post_with_large_image.pk).image_renditions
+    Post.objects.update(image_renditions={})
+    call_command('backfill_renditions')
+    renditions = Post.objects.get(
+        pk=post_with_large_image.pk).image_renditions
+    assert renditions['card']['width'] == 640, (
+        'Убедитесь, что команда `backfill_renditions` создаёт копии для '
+        'существующих публикаций.'
+    )
+    assert renditions == before, (
+        'Убедитесь, что копия с тем же содержимым сохраняется под тем же '
+        'именем.'
+    )
+    assert 'Копии созданы: 1' in capsys.readouterr().out
@@ -0,0 +1,151 @@
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.dumps import iter_json_array
+from blog.models import FeedEntry, Post
+from blog.scheduler import get_publication_state
+
+DUMP = [
+    {'model': 'blog.post', 'pk': 7, 'fields': {
+        'title': 'Загруженная публикация', 'text': 'Строка\nвторая строка',
+        'pub_date': '2020-01-01T00:00:00Z', 'author': 3, 'category': 2,
+        'location': 5, 'is_published': True,
+        'created_at': '2020-01-02T00:00:00Z'}},
+    {'model': 'auth.group', 'pk': 4, 'fields': {
+        'name': 'Редакторы', 'permissions': []}},
+    {'model': 'auth.user', 'pk': 3, 'fields': {
+        'username': 'loaded', 'password': '!', 'groups': [4],
+        'date_joined': '2020-01-01T00:00:00Z'}},
+    {'model': 'blog.category', 'pk': 2, 'fields': {
+        'title': 'Категория', 'description': 'Описание', 'slug': 'loaded',
+        'is_published': True, 'created_at': '2019-05-05T00:00:00Z'}},
+    {'model': 'blog.location', 'pk': 5, 'fields': {
+        'name': 'Место', 'is_published': True,
+        'created_at': '2019-05-05T00:00:00Z'}},
+]
+
+
+@pytest.mark.parametrize('chunk_size', (1, 7, 64 * 1024))
+def test_iter_json_array_reads_in_chunks(chunk_size):
+    text = json.dumps(DUMP, ensure_ascii=False, indent=2)
+    assert list(iter_json_array(io.StringIO(text), chunk_size)) == DUMP, (
+        'Убедитесь, что дамп разбирается одинаково при любом размере '
+        'читаемых порций.'
+    )
+    assert list(iter_json_array(io.StringIO(' [ ] '))) == []
+
+
+@pytest.mark.parametrize('text', (
+    '{"model": "blog.post"}', '[{"model": "blog.post"}', '[1, 2]',
+    '[{"pk": 1},]', '[{"pk": 1}] []'))
+def test_iter_json_array_rejects_broken_dump(text):
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO(text), 4))
+
+
+@pytest.fixture
+def dump_file(tmp_path):
+    path = tmp_path / 'dump.json'
+    path.write_text(json.dumps(DUMP, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.django_db
+def test_load_dump_command(capsys, client, dump_file):
+    call_command('load_dump', dump_file, batch_size=2)
+    out = capsys.readouterr().out
+    assert 'Загружено объектов: 5 (новых 5, обновлено 0)' in out
+    post = Post.objects.get(pk=7)
+    assert post.created_at.year == 2020, (
+        'Убедитесь, что `load_dump` сохраняет даты из дампа, а не '
+        'подставляет время загрузки.'
+    )
+    assert post.updated_at is not None
+    assert post.text_html == 'Строка<br>вторая строка', (
+        'Убедитесь, что `load_dump` заполняет HTML текстов публикаций.'
+    )
+    assert FeedEntry.objects.filter(post_id=7).exists()
+    user = get_user_model().objects.get(pk=3)
+    assert list(user.groups.values_list('pk', flat=True)) == [4]
+    response = client.get('/search/', {'q': 'загруженная'})
+    assert [found.id for found in response.context['page_obj']] == [7]
+
+    Post.objects.filter(pk=7).update(title='Изменённая')
+    call_command('load_dump', dump_file, rebuild=False)
+    assert 'новых 0, обновлено 5' in capsys.readouterr().out, (
+        'Убедитесь, что повторная загрузка дампа обновляет существующие '
+        'объекты.'
+    )
+    assert Post.objects.get(pk=7).title == 'Загруженная публикация'
+    assert user.groups.count() == 1
+
+
+@pytest.mark.django_db
+def test_load_dump_checks_foreign_keys(tmp_path):
+    path = tmp_path / 'dump.json'
+    path.write_text(json.dumps(DUMP[:1]), encoding='utf-8')
+    with pytest.raises(CommandError):
+        call_command('load_dump', str(path))
+    assert not Post.objects.exists(), (
+        'Убедитесь, что дамп со ссылками на отсутствующие объекты не '
+        'загружается частично.'
+    )
+
+
+def write_dump(tmp_path, objects):
+    path = tmp_path / 'dump.json'
+    path.write_text(json.dumps(objects, ensure_ascii=False), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.django_db
+def test_load_dump_invalidates_caches(
+        tmp_path, client, user, post_with_published_location):
+    post = post_with_published_location
+    old_username = user.username
+    assert client.get(f'/profile/{old_username}/').status_code == 200
+    assert old_username in client.get('/').content.decode('utf-8')
+    renamed = {'model': 'auth.user', 'pk': user.pk, 'fields': {
+        'username': 'renamed', 'password': '!',
+        'date_joined': '2020-01-01T00:00:00Z'}}
+    call_command('load_dump', write_dump(tmp_path, [renamed]))
+    assert client.get(f'/profile/{old_username}/').status_code == 404, (
+        'Убедитесь, что после загрузки дампа сбрасывается кэш профилей '
+        'загруженных пользователей.'
+    )
+    assert client.get('/profile/renamed/').status_code == 200
+    assert 'renamed' in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что после загрузки дампа сбрасываются страницы и '
+        'карточки публикаций.'
+    )
+
+    pub_date = timezone.now() + timezone.timedelta(days=1)
+    scheduled = dict(DUMP[0], pk=post.pk + 1)
+    scheduled['fields'] = dict(
+        scheduled['fields'], author=user.pk, category=post.category_id,
+        location=None, pub_date=pub_date.isoformat())
+    call_command('load_dump', write_dump(tmp_path, [scheduled]))
+    assert get_publication_state()['next_due'] == pub_date, (
+        'Убедитесь, что после загрузки дампа отложенные публикации '
+        'попадают в состояние планировщика.'
+    )
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_load_dump_rebuilds_target_database(dump_file):
+    with CaptureQueriesContext(connections['replica']) as context:
+        call_command('load_dump', dump_file, database='replica')
+    sql = ' '.join(query['sql'] for query in context.captured_queries)
+    for table in ('blog_feedentry', 'blog_post_search', 'blog_comment'):
+        assert table in sql, (
+            'Убедитесь, что `load_dump --database` пересобирает производные '
+            'данные в той же базе, куда загружен дамп.'
+        )
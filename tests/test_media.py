@@ -0,0 +1,104 @@
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def media_file(media_root):
+    name = default_storage.save('post_images/file.bin', ContentFile(CONTENT))
+    return f'/media/{name}'
+
+
+def read(response):
+    return b''.join(response.streaming_content)
+
+
+def test_media_conditional_get(client, media_file):
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert read(response) == CONTENT
+    assert response['Accept-Ranges'] == 'bytes'
+    assert 'max-age=3600' in response['Cache-Control']
+    assert 'immutable' not in response['Cache-Control']
+    etag, last_modified = response['ETag'], response['Last-Modified']
+
+    for headers in ({'HTTP_IF_NONE_MATCH': etag},
+                    {'HTTP_IF_MODIFIED_SINCE': last_modified}):
+        response = client.get(media_file, **headers)
+        assert response.status_code == 304, (
+            'Убедитесь, что файлы из MEDIA_ROOT отдаются с ETag и '
+            'Last-Modified и повторный запрос получает ответ 304.'
+        )
+        assert response['ETag'] == etag
+    assert client.get(
+        media_file, HTTP_IF_NONE_MATCH='"other"').status_code == 200
+
+
+@pytest.mark.parametrize('header, content_range, body', (
+    ('bytes=0-9', 'bytes 0-9/1024', CONTENT[:10]),
+    ('bytes=1000-', 'bytes 1000-1023/1024', CONTENT[1000:]),
+    ('bytes=-24', 'bytes 1000-1023/1024', CONTENT[-24:]),
+    ('bytes=1020-5000', 'bytes 1020-1023/1024', CONTENT[1020:]),
+))
+def test_media_range(client, media_file, header, content_range, body):
+    response = client.get(media_file, HTTP_RANGE=header)
+    assert response.status_code == 206, (
+        'Убедитесь, что запрос части файла получает ответ 206.'
+    )
+    assert response['Content-Range'] == content_range
+    assert int(response['Content-Length']) == len(body)
+    assert read(response) == body
+
+
+def test_media_range_edge_cases(client, media_file):
+    response = client.get(media_file, HTTP_RANGE='bytes=2000-')
+    assert response.status_code == 416
+    assert response['Content-Range'] == 'bytes */1024'
+    for header in ('bytes=0-1,5-6', 'items=0-1', 'bytes=9-1'):
+        assert client.get(media_file, HTTP_RANGE=header).status_code == 200
+    response = client.get(
+        media_file, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+    assert response.status_code == 200 and read(response) == CONTENT
+    etag = client.get(media_file)['ETag']
+    response = client.get(
+        media_file, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+    assert response.status_code == 206
+
+
+def test_media_rendition_immutable(client, media_root):
+    name = default_storage.save(
+        'post_images/a.card.0123456789ab.webp', ContentFile(b'webp'))
+    response = client.get(f'/media/{name}')
+    assert response['Content-Type'] == 'image/webp'
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что копии изображений с хешем в имени отдаются с '
+        'Cache-Control immutable.'
+    )
+    assert 'max-age=31536000' in response['Cache-Control']
+
+
+@pytest.mark.parametrize('mode, header', (
+    ('x-sendfile', 'X-Sendfile'),
+    ('x-accel-redirect', 'X-Accel-Redirect'),
+))
+def test_media_sendfile(settings, client, media_file, mode, header):
+    settings.BLOG_MEDIA_SENDFILE = mode
+    response = client.get(media_file)
+    assert response.status_code == 200
+    assert response.content == b''
+    if mode == 'x-accel-redirect':
+        assert response[header] == (
+            '/protected-media/' + media_file[len('/media/'):])
+    else:
+        assert response[header] == str(
+            settings.MEDIA_ROOT / media_file[len('/media/'):])
+    assert response['ETag']
+
+
+def test_media_not_found(client, media_file):
+    assert client.get('/media/post_images/missing.bin').status_code == 404
+    assert client.get('/media/post_images').status_code == 404
+    assert client.get('/media/../manage.py').status_code == 404
+    assert client.post(media_file).status_code == 405
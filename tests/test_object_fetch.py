@@ -0,0 +1,54 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def object_selects(client, url, table):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    selects = [
+        q['sql'] for q in queries
+        if q['sql'].startswith(f'SELECT "{table}".')
+        and f'WHERE "{table}"."id" =' in q['sql']
+    ]
+    return response, selects
+
+
+@pytest.mark.django_db
+def test_post_edit_and_delete_fetch_post_once(
+        user_client, post_with_published_location):
+    post_id = post_with_published_location.id
+    for url in (f'/posts/{post_id}/edit/', f'/posts/{post_id}/delete/'):
+        response, selects = object_selects(user_client, url, 'blog_post')
+        assert response.status_code == 200
+        assert len(selects) == 1, (
+            f'Убедитесь, что страница {url} загружает публикацию из базы '
+            'один раз.'
+        )
+
+
+@pytest.mark.django_db
+def test_comment_edit_fetches_comment_once(
+        user, user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    url = f'/posts/{post.id}/edit_comment/{comment.id}/'
+    response, selects = object_selects(user_client, url, 'blog_comment')
+    assert response.status_code == 200
+    assert len(selects) == 1, (
+        'Убедитесь, что страница редактирования комментария загружает '
+        'комментарий один раз и не загружает его автора отдельно.'
+    )
+    _, users = object_selects(user_client, url, 'auth_user')
+    assert len(users) == 1, 'Автор запроса загружается только из сессии.'
+
+
+@pytest.mark.django_db
+def test_foreign_comment_redirects(
+        another_user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post)
+    response = another_user_client.get(
+        f'/posts/{post.id}/edit_comment/{comment.id}/')
+    assert response.status_code == 302
+    assert response['Location'] == f'/posts/{post.id}/'
@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_anonymous_feed_served_from_cache(
+        client, django_assert_num_queries, post_with_published_location):
+    first = client.get('/')
+    with django_assert_num_queries(0):
+        second = client.get('/')
+    assert second.content == first.content, (
+        'Убедитесь, что повторный анонимный запрос ленты отдаётся из кэша.'
+    )
+
+
+@pytest.mark.django_db
+def test_page_cache_invalidated_by_models(
+        client, mixer, post_with_published_location):
+    post = post_with_published_location
+    category_url = f'/category/{post.category.slug}/'
+    profile_url = f'/profile/{post.author.username}/'
+    for url in ('/', category_url, profile_url):
+        client.get(url)
+
+    post.title = 'Заголовок после правки'
+    post.save()
+    for url in ('/', category_url, profile_url):
+        assert post.title in client.get(url).content.decode('utf-8'), (
+            'Убедитесь, что изменение публикации сбрасывает кэш страниц '
+            'лент, в которых она выводится.'
+        )
+
+    mixer.blend('blog.Comment', post=post)
+    assert 'Комментарии (1)' in client.get('/').content.decode('utf-8')
+
+    post.location.name = 'Новое место'
+    post.location.save()
+    assert 'Новое место' in client.get(category_url).content.decode('utf-8')
+
+
+@pytest.mark.django_db
+def test_page_cache_invalidated_by_username_change(
+        client, post_with_published_location):
+    author = post_with_published_location.author
+    client.get('/')
+    author.username = 'renamed_author'
+    author.save()
+    assert '@renamed_author' in client.get('/').content.decode('utf-8')
+    assert client.get('/profile/renamed_author/').status_code == 200
+
+
+@pytest.mark.django_db
+def test_post_card_fragment_invalidated(
+        user_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    user_client.get('/')
+    post.category.title = 'Новая категория'
+    post.category.save()
+    assert 'Новая категория' in user_client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что изменение категории сбрасывает кэш карточек '
+        'публикаций.'
+    )
+    mixer.blend('blog.Comment', post=post)
+    assert 'Комментарии (1)' in user_client.get('/').content.decode('utf-8')
@@ -0,0 +1,32 @@
+import pytest
+from django.template.loader import render_to_string
+
+from blog.pagination import CachedCountPaginator
+from conftest import N_PER_PAGE
+
+
+def test_elided_page_range_is_bounded():
+    paginator = CachedCountPaginator(range(N_PER_PAGE * 50_000), N_PER_PAGE)
+    page = paginator.page(25_000)
+    window = list(page.elided_page_range())
+    assert window == [
+        1, paginator.ELLIPSIS,
+        *range(24_997, 25_004),
+        paginator.ELLIPSIS, 50_000,
+    ], (
+        'Убедитесь, что навигация выводит первую, последнюю и по три '
+        'соседних с текущей страницы.'
+    )
+
+    html = render_to_string('includes/paginator.html', {'page_obj': page})
+    assert html.count('page-link') < 20, (
+        'Убедитесь, что шаблон навигации не выводит ссылку на каждую '
+        'страницу ленты.'
+    )
+
+
+@pytest.mark.django_db
+def test_feed_uses_elided_page_range(
+        user_client, many_posts_with_published_locations):
+    content = user_client.get('/?page=2').content.decode('utf-8')
+    assert 'href="?page=1"' in content
@@ -0,0 +1,49 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+
+@pytest.mark.django_db
+def test_excerpt_and_html_rendered_on_save(
+        user_client, post_with_published_location):
+    post = post_with_published_location
+    post.text = ('Первая строка <script>alert(1)</script>\n'
+                 + ' '.join(f'слово{n}' for n in range(30)))
+    post.save()
+    post.refresh_from_db()
+    assert post.excerpt == (
+        'Первая строка <script>alert(1)</script> слово0 слово1 слово2 '
+        'слово3 слово4 слово5 слово6 …'), (
+        'Убедитесь, что при сохранении публикации в `excerpt` '
+        'записываются первые 10 слов текста.'
+    )
+    assert post.text_html.startswith(
+        'Первая строка &lt;script&gt;alert(1)&lt;/script&gt;<br>слово0'), (
+        'Убедитесь, что при сохранении публикации в `text_html` '
+        'записывается экранированный текст с переносами строк.'
+    )
+
+    content = user_client.get('/').content.decode('utf-8')
+    assert '&lt;script&gt;alert(1)&lt;/script&gt; слово0' in content
+    assert '<script>alert' not in content
+    content = user_client.get(
+        f'/posts/{post.id}/').content.decode('utf-8')
+    assert post.text_html in content
+    assert '<script>alert' not in content
+
+
+@pytest.mark.django_db
+def test_render_post_text_command(capsys, post_with_published_location):
+    post = post_with_published_location
+    rendered = Post.objects.values('excerpt', 'text_html').get(pk=post.pk)
+    Post.objects.update(excerpt='', text_html='')
+    call_command('render_post_text', batch_size=1)
+    assert Post.objects.values(
+        'excerpt', 'text_html').get(pk=post.pk) == rendered, (
+        'Убедитесь, что команда `render_post_text` заполняет отрывок и '
+        'HTML текста публикаций.'
+    )
+    assert 'Обновлено публикаций: 1' in capsys.readouterr().out
+    call_command('render_post_text')
+    assert 'Обновлено публикаций: 0' in capsys.readouterr().out
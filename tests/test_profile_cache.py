@@ -0,0 +1,47 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def user_selects(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [q['sql'] for q in queries
+                      if '"auth_user"' in q['sql']
+                      and '"auth_user"."username" =' in q['sql']]
+
+
+@pytest.mark.django_db
+def test_profile_resolves_username_from_cache(
+        user_client, post_with_published_location):
+    author = post_with_published_location.author
+    url = f'/profile/{author.username}/'
+    user_selects(user_client, url)
+    response, selects = user_selects(user_client, url)
+    assert not selects, (
+        'Убедитесь, что страница пользователя не ищет автора по имени в '
+        'базе на каждый запрос.'
+    )
+    assert response.context['profile'].pk == author.pk
+    assert post_with_published_location in response.context['page_obj']
+
+
+@pytest.mark.django_db
+def test_profile_cache_invalidated_on_username_change(
+        user, user_client, post_with_published_location):
+    old_url = f'/profile/{user.username}/'
+    assert user_client.get(old_url).status_code == 200
+    response = user_client.post('/edit_profile/', {
+        'username': 'renamed_user',
+        'first_name': 'Имя',
+        'last_name': 'Фамилия',
+        'email': 'renamed@example.com',
+    })
+    assert response.status_code == 302
+    assert user_client.get(old_url).status_code == 404, (
+        'Убедитесь, что после смены имени пользователя старый адрес '
+        'профиля больше не открывается.'
+    )
+    response = user_client.get('/profile/renamed_user/')
+    assert response.status_code == 200
+    assert 'Имя Фамилия' in response.content.decode('utf-8')
@@ -0,0 +1,124 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+from blog.middleware import QueryBudgetExceeded
+from blog.models import Comment, FeedEntry, Post
+from blog.search import search_posts
+from blog.views import PostCreateView, PostListView
+from blogicum import settings as project_settings
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_QUERY_STATS_HEADERS=True)
+def test_sql_stats_headers_and_log(
+        user_client, caplog, post_with_published_location):
+    with caplog.at_level(logging.INFO, logger='blog.sql'):
+        response = user_client.get('/')
+    queries = int(response['X-SQL-Queries'])
+    assert 0 < queries <= PostListView.query_budget, (
+        'Убедитесь, что главная страница укладывается в бюджет '
+        'SQL-запросов.'
+    )
+    assert float(response['X-SQL-Time-Ms']) >= float(
+        response['X-SQL-Slowest-Ms'])
+    record = caplog.records[-1].sql_stats
+    assert record['view'] == 'blog:index'
+    assert record['queries'] == queries
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_QUERY_BUDGET_ENFORCE=True)
+def test_query_budget_enforced(user_client, monkeypatch):
+    monkeypatch.setattr(PostListView, 'query_budget', 1)
+    with pytest.raises(QueryBudgetExceeded):
+        user_client.get('/')
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_QUERY_BUDGET_ENFORCE=True)
+def test_query_budget_does_not_abort_writes(
+        user_client, monkeypatch, post_with_published_location):
+    monkeypatch.setattr(PostCreateView, 'query_budget', 8)
+    post = post_with_published_location
+    with pytest.raises(QueryBudgetExceeded):
+        user_client.post('/posts/create/', {
+            'title': 'Сверх бюджета', 'text': 'Текст',
+            'pub_date': post.pub_date.strftime('%Y-%m-%dT%H:%M'),
+            'category': post.category_id, 'is_published': True})
+    created = Post.objects.get(title='Сверх бюджета')
+    assert FeedEntry.objects.filter(post=created).exists(), (
+        'Убедитесь, что бюджет SQL-запросов проверяется после того, как '
+        'представление закончило запись.'
+    )
+    assert [found.id for found in search_posts(
+        Post.objects.all(), 'бюджета')] == [created.id]
+
+
+def test_sql_stats_headers_follow_debug():
+    assert project_settings.BLOG_QUERY_STATS_HEADERS is (
+        project_settings.DEBUG), (
+        'Убедитесь, что заголовки X-SQL-* по умолчанию отправляются только '
+        'при DEBUG: они раскрывают клиенту время работы базы.'
+    )
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_QUERY_STATS_HEADERS=False)
+def test_sql_stats_headers_disabled(
+        user_client, caplog, post_with_published_location):
+    with caplog.at_level(logging.INFO, logger='blog.sql'):
+        response = user_client.get('/')
+    assert not [name for name in response.headers
+                if name.startswith('X-SQL-')]
+    assert caplog.records[-1].sql_stats['queries'] > 0, (
+        'Убедитесь, что без заголовков статистика запросов по-прежнему '
+        'пишется в журнал.'
+    )
+
+
+@pytest.mark.django_db
+def test_views_fit_query_budget(
+        user, user_client, caplog, post_with_published_location):
+    post = post_with_published_location
+    comment = Comment.objects.create(post=post, author=user, text='Текст')
+    post_data = {
+        'title': 'Заголовок', 'text': 'Текст',
+        'pub_date': post.pub_date.strftime('%Y-%m-%dT%H:%M'),
+        'category': post.category_id, 'location': post.location_id,
+        'is_published': True}
+    requests = [
+        ('get', '/', None),
+        ('get', f'/posts/{post.id}/', None),
+        ('get', f'/posts/{post.id}/comments/', None),
+        ('get', f'/category/{post.category.slug}/', None),
+        ('get', '/search/', {'q': post.title}),
+        ('get', f'/profile/{user.username}/', None),
+        ('get', '/posts/create/', None),
+        ('post', '/posts/create/', post_data),
+        ('get', f'/posts/{post.id}/edit/', None),
+        ('post', f'/posts/{post.id}/edit/', post_data),
+        ('post', f'/posts/{post.id}/comment/', {'text': 'Ещё'}),
+        ('get', f'/posts/{post.id}/edit_comment/{comment.id}/', None),
+        ('post', f'/posts/{post.id}/edit_comment/{comment.id}/',
+         {'text': 'Правка'}),
+        ('post', f'/posts/{post.id}/delete_comment/{comment.id}/', None),
+        ('get', '/edit_profile/', None),
+        ('post', '/edit_profile/', {
+            'first_name': 'Имя', 'last_name': 'Фамилия',
+            'username': user.username, 'email': 'user@example.com'}),
+        ('get', f'/posts/{post.id}/delete/', None),
+        ('post', f'/posts/{post.id}/delete/', None),
+    ]
+    for method, url, data in requests:
+        caplog.clear()
+        with caplog.at_level(logging.INFO, logger='blog.sql'):
+            response = getattr(user_client, method)(url, data)
+        assert response.status_code in (200, 302), url
+        record = caplog.records[-1].sql_stats
+        assert record['budget'] is not None, url
+        assert record['queries'] <= record['budget'], (
+            f'Убедитесь, что {method.upper()} {url} укладывается в бюджет '
+            f'SQL-запросов: {record["queries"]} > {record["budget"]}.'
+        )
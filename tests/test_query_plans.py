@@ -0,0 +1,91 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.views import (
+    CategoryPostsListView, PostDetailView, PostListView, PostSearchView,
+    ProfileListView
+)
+from conftest import N_PER_PAGE
+
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+( AS \w+)?$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def explain(queryset):
+    sql, params = queryset.query.get_compiler(
+        connection=connection).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def view_queryset(view_class, user, **kwargs):
+    request = RequestFactory().get('/')
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def assert_indexed(name, queryset):
+    plan = explain(queryset)
+    for step in plan:
+        assert not FULL_SCAN.match(step), (
+            f'Запрос `{name}` выполняет полное сканирование таблицы: '
+            f'{plan}'
+        )
+        assert TEMP_SORT not in step, (
+            f'Запрос `{name}` сортирует результат во временном B-дереве '
+            f'вместо индекса: {plan}'
+        )
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='EXPLAIN QUERY PLAN есть только в SQLite')
+@pytest.mark.django_db
+def test_view_querysets_use_indexes(
+        user, post_with_published_location, comment_to_a_post):
+    post = post_with_published_location
+    querysets = {
+        'blog:index': view_queryset(PostListView, user),
+        'blog:category_posts': view_queryset(
+            CategoryPostsListView, user,
+            category_slug=post.category.slug),
+        'blog:profile': view_queryset(
+            ProfileListView, user, username=post.author.username),
+    }
+    for name, queryset in querysets.items():
+        assert_indexed(name, queryset[:N_PER_PAGE])
+
+    request = RequestFactory().get('/')
+    request.user = user
+    detail = PostDetailView()
+    detail.setup(request, id=post.id)
+    detail.object = detail.get_object()
+    comments = detail.get_context_data()['comments']
+    assert_indexed('blog:post_detail', comments.paginator.page_queryset())
+    assert_indexed(
+        'blog:post_comments',
+        comments.paginator.page_queryset(
+            after=comments.paginator.encode_cursor(comment_to_a_post)))
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='EXPLAIN QUERY PLAN есть только в SQLite')
+@pytest.mark.django_db
+def test_search_driven_by_fts_index(user, post_with_published_location):
+    request = RequestFactory().get('/search/', {'q': 'слово'})
+    request.user = user
+    view = PostSearchView()
+    view.setup(request)
+    plan = explain(view.get_queryset()[:N_PER_PAGE])
+    assert plan[0].startswith('SCAN blog_post_search VIRTUAL TABLE'), (
+        f'Убедитесь, что поиск начинается с индекса FTS5: {plan}'
+    )
+    for step in plan:
+        assert not FULL_SCAN.match(step), (
+            f'Поиск выполняет полное сканирование таблицы: {plan}'
+        )
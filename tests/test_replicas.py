@@ -0,0 +1,58 @@
+import sqlite3
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.routers import (
+    PRIMARY_DB, ReplicaRouter, copy_sqlite_database, replica_reads
+)
+
+
+@override_settings(BLOG_DB_REPLICAS=['replica'])
+def test_router_sends_only_allowed_reads_to_replicas():
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) == PRIMARY_DB
+    with replica_reads():
+        assert router.db_for_read(Post) == 'replica'
+        assert router.db_for_read(get_user_model()) == PRIMARY_DB
+        assert router.db_for_write(Post) == PRIMARY_DB
+    assert router.db_for_read(Post) == PRIMARY_DB
+
+
+@pytest.mark.django_db(
+    transaction=True, databases=['default', 'replica'])
+@override_settings(BLOG_DB_REPLICAS=['replica'])
+def test_reads_sticky_after_write(user_client, post_with_published_location):
+    post = post_with_published_location
+    with CaptureQueriesContext(connections['replica']) as replica_queries:
+        user_client.get(f'/posts/{post.id}/')
+    assert replica_queries, (
+        'Убедитесь, что страница публикации читает данные с реплики.'
+    )
+
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', data={'text': 'Комментарий'})
+    assert 'blog_primary' in response.cookies
+    with CaptureQueriesContext(connections['replica']) as replica_queries:
+        user_client.get(f'/posts/{post.id}/')
+    assert not replica_queries, (
+        'Убедитесь, что сразу после изменения данных пользователь читает '
+        'основную базу.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_copy_step_syncs_sqlite_file(tmp_path, post_with_published_location):
+    target = tmp_path / 'replica.sqlite3'
+    copy_sqlite_database(target)
+    with sqlite3.connect(target) as replica:
+        titles = replica.execute('SELECT title FROM blog_post').fetchall()
+    replica.close()
+    assert titles == [(post_with_published_location.title,)], (
+        'Убедитесь, что копирование переносит данные основной базы в файл '
+        'реплики.'
+    )
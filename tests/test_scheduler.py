@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.cache import INDEX_FEED, invalidate_feed_counts, page_cache
+from blog.models import FeedEntry, Post
+from blog.scheduler import get_publication_state, publish_due
+
+
+@pytest.mark.django_db
+def test_post_saved_after_state_cached_is_visible(
+        client, user_client, post_with_published_location):
+    post = post_with_published_location
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    assert post.title not in user_client.get('/').content.decode('utf-8')
+    assert get_publication_state() is not None
+
+    # Другой процесс с собственным кэшем: сигналы этого процесса не
+    # срабатывают, и его состояние планировщика не сдвигается.
+    now = timezone.now()
+    Post.objects.filter(pk=post.pk).update(pub_date=now)
+    FeedEntry.objects.filter(post_id=post.pk).update(pub_date=now)
+    invalidate_feed_counts([INDEX_FEED])
+    assert post.title in user_client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что публикация, сохранённая после проверки '
+        'планировщика, видна сразу, а не через '
+        'BLOG_PUBLICATION_STATE_TTL.'
+    )
+    response = client.get('/search/', {'q': post.title.split()[0]})
+    assert post in response.context['page_obj']
+
+
+@pytest.mark.django_db
+def test_building_feed_query_has_no_side_effects(
+        django_assert_num_queries):
+    page_cache().clear()
+    with django_assert_num_queries(0):
+        Post.objects.published_filter()
+        Post.objects.feed_entries(category_id=1)
+    assert get_publication_state() is None, (
+        'Убедитесь, что построение запроса ленты не обращается к '
+        'планировщику.'
+    )
+
+
+@pytest.mark.django_db
+def test_scheduled_post_released_by_scheduler(
+        client, post_with_published_location):
+    post = post_with_published_location
+    post.pub_date = timezone.now() + timedelta(hours=1)
+    post.save()
+    assert get_publication_state()['next_due'] == post.pub_date
+    assert post.title not in client.get('/').content.decode('utf-8')
+
+    publish_due(now=post.pub_date)
+    assert post.title in client.get('/').content.decode('utf-8'), (
+        'Убедитесь, что после наступления срока публикация появляется в '
+        'закэшированной ленте.'
+    )
+    assert get_publication_state()['next_due'] is None
+
+
+@pytest.mark.django_db
+def test_publish_scheduled_command(capsys, post_with_published_location):
+    call_command('publish_scheduled')
+    assert 'Горизонт' in capsys.readouterr().out
@@ -0,0 +1,108 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from blog.models import Post
+from blog.search import SEARCH_TABLE
+
+
+def search(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+    return response
+
+
+def found(response):
+    return [post.id for post in response.context['page_obj']]
+
+
+@pytest.mark.django_db
+def test_search_ranks_and_highlights(
+        client, mixer, user, published_category):
+    in_text = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(), title='Прогулка',
+        text='Утром мы пошли в лес за грибами.')
+    in_title = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(), title='Осенний лес',
+        text='<script>alert(1)</script> Ёлки и сосны.')
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(), title='Море',
+        text='Ничего общего.')
+
+    response = search(client, 'лес')
+    assert found(response) == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск находит публикации по заголовку и тексту и '
+        'ставит совпадения в заголовке выше.'
+    )
+    content = response.content.decode('utf-8')
+    assert '<mark>лес</mark>' in content
+    assert '<script>' not in content, (
+        'Убедитесь, что фрагменты текста в результатах поиска экранируются.'
+    )
+    assert found(search(client, 'лесу елки')) == []
+    assert found(search(client, 'ЁЛКИ сосн')) == [in_title.id]
+    assert found(search(client, '"OR* NEAR(')) == []
+    assert found(search(client, '')) == []
+
+
+@pytest.mark.django_db
+def test_search_shows_original_text(client, mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        is_published=True, pub_date=timezone.now(), title='Ёлка зелёная',
+        text=' '.join(['Слово'] * 40 + ['Зимой ёлка зелёная']
+                      + ['слово'] * 40))
+    response = search(client, 'елка')
+    assert found(response) == [post.id]
+    content = response.content.decode('utf-8')
+    assert '<mark>Ёлка</mark> зелёная' in content, (
+        'Убедитесь, что в результатах поиска выводится исходный заголовок '
+        'публикации, а не текст индекса с «е» вместо «ё».'
+    )
+    assert 'Зимой <mark>ёлка</mark> зелёная' in content
+    assert 'зеленая' not in content
+
+
+@pytest.mark.django_db
+def test_search_follows_posts_and_visibility(
+        client, post_with_published_location):
+    post = post_with_published_location
+    post.title = 'Уникальноеслово'
+    post.save()
+    assert found(search(client, 'уникальноеслово')) == [post.id]
+
+    post.category.is_published = False
+    post.category.save()
+    assert found(search(client, 'уникальноеслово')) == [], (
+        'Убедитесь, что поиск показывает только опубликованные публикации.'
+    )
+    post.category.is_published = True
+    post.category.save()
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() + timezone.timedelta(days=1))
+    assert found(search(client, 'уникальноеслово')) == []
+
+    post.delete()
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM {SEARCH_TABLE}')
+        assert cursor.fetchone() == (0,), (
+            'Убедитесь, что удалённая публикация удаляется из индекса.'
+        )
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index(capsys, client, post_with_published_location):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+    word = post_with_published_location.title.split()[0]
+    assert found(search(client, word)) == []
+    call_command('rebuild_search_index', batch_size=1)
+    assert found(search(client, word)) == [
+        post_with_published_location.id], (
+        'Убедитесь, что команда `rebuild_search_index` заполняет индекс.'
+    )
+    assert 'Публикаций в поисковом индексе: 1' in capsys.readouterr().out
@@ -0,0 +1,37 @@
+import pytest
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import override_settings
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='Настройки соединения SQLite')
+
+
+def pragma(wrapper, name):
+    return wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+@override_settings(BLOG_SQLITE_PRAGMAS={
+    'busy_timeout': 1234,
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'mmap_size': 1024 * 1024,
+    'cache_size': -2048,
+})
+def test_new_connection_gets_pragmas(tmp_path, django_db_blocker):
+    settings_dict = {**connection.settings_dict,
+                     'NAME': str(tmp_path / 'blog.sqlite3')}
+    wrapper = DatabaseWrapper(settings_dict, alias='pragma_check')
+    with django_db_blocker.unblock():
+        wrapper.ensure_connection()
+    try:
+        assert pragma(wrapper, 'journal_mode') == 'wal', (
+            'Убедитесь, что новое соединение с SQLite переводится в режим '
+            'WAL.'
+        )
+        assert pragma(wrapper, 'busy_timeout') == 1234
+        assert pragma(wrapper, 'synchronous') == 1
+        assert pragma(wrapper, 'mmap_size') == 1024 * 1024
+        assert pragma(wrapper, 'cache_size') == -2048
+    finally:
+        wrapper.close()